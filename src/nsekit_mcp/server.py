@@ -1,14 +1,26 @@
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import FastMCP, Context
+from pydantic import AnyUrl
 from NseKit import NseKit, Moneycontrol
 import pandas as pd
+import numpy as np
 import time
+import asyncio
+import datetime as dt
 import json
 import os
-from threading import Lock
+import itertools
+from urllib.parse import urlencode
+import re
+import inspect
+import warnings
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from threading import Lock, Thread, Timer
 from starlette.applications import Starlette
 from starlette.routing import Mount
 from starlette.requests import Request
-from starlette.responses import Response
+from starlette.responses import Response, JSONResponse
+from starlette.concurrency import run_in_threadpool
 
 # ================================================================
 #                   RATE LIMIT CONTROL (NSE Safe)
@@ -36,6 +48,18 @@ MCP_BEARER_TOKEN = os.environ.get("MCP_BEARER_TOKEN", "")
 MCP_HOST = os.environ.get("MCP_HOST", "0.0.0.0")
 MCP_PORT = int(os.environ.get("MCP_PORT", "8000"))
 
+# Response compression (HTTP transport). Empty MCP_COMPRESSION_ENCODINGS disables it.
+MCP_COMPRESSION_ENCODINGS = [
+    e.strip().lower() for e in os.environ.get("MCP_COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",") if e.strip()
+]
+MCP_COMPRESSION_MIN_BYTES = int(os.environ.get("MCP_COMPRESSION_MIN_BYTES", "1024"))
+MCP_COMPRESSION_LEVEL = int(os.environ["MCP_COMPRESSION_LEVEL"]) if os.environ.get("MCP_COMPRESSION_LEVEL") else None
+
+# Tool listing: "compact" registers one-line descriptions (full text via tool_help);
+# MCP_TOOL_CATEGORIES limits registration to the listed categories (or prefixes, e.g. "FnO").
+MCP_TOOL_DESCRIPTIONS = os.environ.get("MCP_TOOL_DESCRIPTIONS", "full")
+MCP_TOOL_CATEGORIES = [c.strip() for c in os.environ.get("MCP_TOOL_CATEGORIES", "").split(",") if c.strip()]
+
 # ================================================================
 #                   MCP + NseKit Initialization
 # ================================================================
@@ -54,6 +78,600 @@ def df_to_json(data):
         return data.to_dict(orient="records")
     return data
 
+# ================================================================
+#                   FRAME CACHE (shared by tools & exports)
+# ================================================================
+
+LIVE_CACHE_TTL = float(os.environ.get("MCP_LIVE_CACHE_TTL", "2"))
+HISTORY_CACHE_TTL = float(os.environ.get("MCP_HISTORY_CACHE_TTL", "900"))
+EOD_CACHE_TTL = float(os.environ.get("MCP_EOD_CACHE_TTL", "86400"))
+# EOD requests for today (or "latest") may precede NSE publishing the file
+EOD_TODAY_CACHE_TTL = float(os.environ.get("MCP_EOD_TODAY_CACHE_TTL", "300"))
+FRAME_CACHE_MAX_ENTRIES = int(os.environ.get("MCP_FRAME_CACHE_MAX_ENTRIES", "4096"))
+
+_frame_cache = OrderedDict()
+_frame_cache_lock = Lock()
+_inflight = {}   # key → Future of a fetch in progress (concurrent callers wait on it)
+
+def cached_frame(name, fetch, ttl=EOD_CACHE_TTL, **params):
+    """
+    Returns fetch(**params), reusing a result fetched less than `ttl` seconds ago.
+    Concurrent calls for the same key share a single upstream fetch.
+    """
+    key = (name, tuple(sorted(params.items())))
+    with _frame_cache_lock:
+        entry = _frame_cache.get(key)
+        if entry is not None and time.time() - entry[0] < ttl:
+            _frame_cache.move_to_end(key)
+            return entry[1]
+        pending = _inflight.get(key)
+        if pending is None:
+            _inflight[key] = Future()
+
+    if pending is not None:
+        return pending.result()
+
+    try:
+        rate_limit()
+        data = fetch(**params)
+    except Exception as e:
+        with _frame_cache_lock:
+            _inflight.pop(key).set_exception(e)
+        raise
+
+    with _frame_cache_lock:
+        # empty results (e.g. a file not published yet) are returned but never cached
+        if not is_empty_result(data):
+            _frame_cache[key] = (time.time(), data)
+            _frame_cache.move_to_end(key)
+            while len(_frame_cache) > FRAME_CACHE_MAX_ENTRIES:
+                _frame_cache.popitem(last=False)
+        _inflight.pop(key).set_result(data)
+    return data
+
+def is_empty_result(data):
+    if data is None:
+        return True
+    if isinstance(data, pd.DataFrame):
+        return data.empty
+    return isinstance(data, (list, dict)) and not data
+
+MEMO_MAX_ENTRIES = int(os.environ.get("MCP_MEMO_MAX_ENTRIES", "512"))
+
+class BoundedMemo:
+    """
+    Thread-safe LRU mapping for results derived from cached frames (analytics, factor indices,
+    per-day arrays). The least recently used entry is evicted past max_entries.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or MEMO_MAX_ENTRIES
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return value
+
+# ================================================================
+#                   PARALLEL FETCH POOL
+# ================================================================
+
+# Upstream calls still pass through rate_limit(); the pool only overlaps their latency.
+FETCH_WORKERS = int(os.environ.get("MCP_FETCH_WORKERS", "4"))
+_fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="nse-fetch")
+
+def run_parallel(tasks, deadline=None):
+    """
+    Runs {key: callable} on the fetch pool.
+    Returns (results, errors, timed_out): values by key, error messages by key,
+    and the keys still unfinished after `deadline` seconds (those are cancelled).
+    """
+    futures = {_fetch_pool.submit(fn): key for key, fn in tasks.items()}
+    done, not_done = wait(futures, timeout=deadline)
+    results, errors = {}, {}
+    for future in done:
+        key = futures[future]
+        try:
+            results[key] = future.result()
+        except Exception as e:
+            errors[key] = f"{type(e).__name__}: {e}"
+    for future in not_done:
+        future.cancel()
+    return results, errors, [futures[f] for f in not_done]
+
+# Tabular NseKit calls whose results are shared between tools and bulk exports.
+# name → (fetch(**params), ttl seconds)
+FRAME_SOURCES = {
+    "equity_volume_surge": (lambda: get.cm_live_volume_spurts(), LIVE_CACHE_TTL),
+    "equity_52week_high_live": (lambda: get.cm_live_52week_high(), LIVE_CACHE_TTL),
+    "equity_52week_low_live": (lambda: get.cm_live_52week_low(), LIVE_CACHE_TTL),
+    "fno_live_change_in_oi": (lambda: get.fno_live_change_in_oi(), LIVE_CACHE_TTL),
+    "fno_live_most_active_underlying": (lambda: get.fno_live_most_active_underlying(), LIVE_CACHE_TTL),
+    "market_live_status": (lambda mode="Market Status": get.nse_market_status(mode), LIVE_CACHE_TTL),
+    "indices_live_data": (lambda: get.index_live_all_indices_data(), LIVE_CACHE_TTL),
+    "index_live_constituents": (
+        lambda index_name, list_only=False: get.index_live_indices_stocks_data(index_name, list_only=list_only),
+        LIVE_CACHE_TTL,
+    ),
+    "fno_live_option_chain": (
+        lambda symbol, expiry=None, compact=False:
+            get.fno_live_option_chain(symbol, expiry_date=expiry, oi_mode="compact" if compact else None),
+        LIVE_CACHE_TTL,
+    ),
+    "equity_price_history": (
+        lambda symbol, period=None, from_date=None, to_date=None:
+            get.cm_hist_security_wise_data(symbol=symbol, period=period, from_date=from_date, to_date=to_date),
+        HISTORY_CACHE_TTL,
+    ),
+    "index_price_history": (
+        lambda index, period=None, from_date=None, to_date=None:
+            get.index_historical_data(index=index, period=period, from_date=from_date, to_date=to_date),
+        HISTORY_CACHE_TTL,
+    ),
+    "corporate_actions": (
+        lambda symbol=None, period=None, start_date=None, end_date=None, purpose=None:
+            get.cm_live_hist_corporate_action(symbol, period, start_date, end_date, purpose),
+        HISTORY_CACHE_TTL,
+    ),
+    "corporate_announcement": (
+        lambda symbol=None, from_date=None, to_date=None:
+            get.cm_live_hist_corporate_announcement(symbol, from_date, to_date),
+        HISTORY_CACHE_TTL,
+    ),
+}
+
+# Date-keyed EOD datasets (tool name → NseKit call taking "DD-MM-YYYY").
+# Published EOD files never change, so these are also archived per date (see EOD ARCHIVE).
+EOD_SOURCES = {
+    "equity_eod_bhavcopy":          get.cm_eod_equity_bhavcopy,
+    "equity_eod_bhavcopy_delivery": get.cm_eod_bhavcopy_with_delivery,
+    "index_eod_bhavcopy":           get.index_eod_bhav_copy,
+    "fno_bhavcopy":                 get.fno_eod_bhav_copy,
+    "market_eod_activity_report":   get.cm_eod_market_activity_report,
+    "equity_52week_high_low_eod":   get.cm_eod_52_week_high_low,
+    "equity_short_selling":         get.cm_eod_shortselling,
+    "surveillance_indicator":       get.cm_eod_surveillance_indicator,
+    "equity_price_band_changes":    get.cm_eod_eq_band_changes,
+    "equity_price_bands":           get.cm_eod_eq_price_band,
+    "equity_pe_ratio":              get.cm_eod_pe_ratio,
+    "market_cap":                   get.cm_eod_mcap,
+    "fno_fii_stats":                get.fno_eod_fii_stats,
+    "fno_eod_top10_futures":        get.fno_eod_top10_fut,
+    "fno_eod_top20_options":        get.fno_eod_top20_opt,
+    "fno_ban_list":                 get.fno_eod_sec_ban,
+    "fno_mwpl_data":                get.fno_eod_mwpl_3,
+    "fno_combined_oi":              get.fno_eod_combine_oi,
+    "fno_participant_wise_oi":      get.fno_eod_participant_wise_oi,
+    "fno_participant_wise_volume":  get.fno_eod_participant_wise_vol,
+}
+def _eod_fetch(fetch):
+    """EOD_SOURCES call as fetch(date); a closure, so its only parameter (and export query param) is date."""
+    return lambda date: fetch(date)
+
+FRAME_SOURCES.update({name: (_eod_fetch(fetch), EOD_CACHE_TTL) for name, fetch in EOD_SOURCES.items()})
+
+def source_frame(name, **params):
+    """
+    Fetches a registered FRAME_SOURCES dataset through the frame cache. EOD datasets keep the long
+    TTL only for past dates; today's (or the default "latest") file may still change or appear.
+    """
+    fetch, ttl = FRAME_SOURCES[name]
+    params = {k: v for k, v in params.items() if v is not None}
+    if name in EOD_SOURCES:
+        try:
+            past = parse_nse_date(params["date"]) < dt.date.today()
+        except (KeyError, TypeError, ValueError, AttributeError):
+            past = False
+        if not past:
+            ttl = min(ttl, EOD_TODAY_CACHE_TTL)
+    return cached_frame(name, fetch, ttl=ttl, **params)
+
+def coerce_query_params(fetch, params):
+    """
+    Query-string values → the types of the fetch function's defaults ("false" → False, "5" → 5),
+    so HTTP exports hit the same cache keys as tool calls. Raises ValueError for parameters the
+    fetch function does not take or required ones that are missing.
+    """
+    signature = inspect.signature(fetch)
+    try:
+        signature.bind(**params)
+    except TypeError as e:
+        raise ValueError(str(e)) from None
+    defaults = {n: p.default for n, p in signature.parameters.items()}
+    coerced = {}
+    for name, value in params.items():
+        default = defaults.get(name)
+        if isinstance(default, bool):
+            lowered = value.strip().lower()
+            if lowered not in ("true", "false", "1", "0", "yes", "no"):
+                raise ValueError(f"{name} must be true or false")
+            coerced[name] = lowered in ("true", "1", "yes")
+        elif isinstance(default, (int, float)):
+            coerced[name] = type(default)(value)
+        else:
+            coerced[name] = value
+    return coerced
+
+def find_column(df, candidates):
+    """First column of df matching a candidate name (case/space-insensitive), else None."""
+    normalized = {str(c).lower().replace(" ", "").replace("_", ""): c for c in df.columns}
+    for cand in candidates:
+        col = normalized.get(cand.lower().replace(" ", "").replace("_", ""))
+        if col is not None:
+            return col
+    return None
+
+def json_safe(df):
+    """DataFrame → records with NaN/NaT replaced by None."""
+    return df.astype(object).where(pd.notna(df), None).to_dict(orient="records")
+
+# ================================================================
+#                   DATE HELPERS
+# ================================================================
+
+NSE_DATE_FORMAT = "%d-%m-%Y"
+PERIOD_DAYS = {"1D": 1, "1W": 7, "1M": 31, "3M": 92, "6M": 183, "1Y": 366, "2Y": 731, "5Y": 1827, "10Y": 3653}
+DATE_COLUMNS = ("CH_TIMESTAMP", "TIMESTAMP", "mTIMESTAMP", "FH_TIMESTAMP", "HistoricalDate", "Date", "date", "timestamp")
+
+def parse_nse_date(value):
+    """'DD-MM-YYYY' (or any date/datetime) → datetime.date."""
+    if isinstance(value, dt.datetime):
+        return value.date()
+    if isinstance(value, dt.date):
+        return value
+    return dt.datetime.strptime(value.strip(), NSE_DATE_FORMAT).date()
+
+def format_nse_date(day):
+    return day.strftime(NSE_DATE_FORMAT)
+
+def resolve_date_range(period=None, from_date=None, to_date=None, default_period="1Y"):
+    """(period | from_date, to_date) → (start, end) dates; end defaults to today."""
+    end = parse_nse_date(to_date) if to_date else dt.date.today()
+    if from_date:
+        return parse_nse_date(from_date), end
+    period = (period or default_period).upper()
+    if period == "YTD":
+        return dt.date(end.year, 1, 1), end
+    if period not in PERIOD_DAYS:
+        raise ValueError(f"Unsupported period '{period}'. Use one of {', '.join(PERIOD_DAYS)} or YTD")
+    return end - dt.timedelta(days=PERIOD_DAYS[period]), end
+
+def date_column(df):
+    col = find_column(df, DATE_COLUMNS)
+    if col is None:
+        col = next((c for c in df.columns if "date" in str(c).lower() or "timestamp" in str(c).lower()), None)
+    return col
+
+def parse_dates(series):
+    """Parses NSE date strings (DD-MM-YYYY, DD-Mon-YYYY or ISO) into datetimes."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    iso = pd.to_datetime(series, format="ISO8601", errors="coerce")
+    if iso.notna().all():
+        return iso
+    return iso.fillna(pd.to_datetime(series, dayfirst=True, errors="coerce", format="mixed"))
+
+# ================================================================
+#                   EOD ARCHIVE & TRADING CALENDAR
+# ================================================================
+
+# Directory for per-date Parquet files of EOD_SOURCES datasets (needs pyarrow). Empty = memory cache only.
+EOD_ARCHIVE_DIR = os.environ.get("MCP_EOD_ARCHIVE_DIR", "")
+
+def archive_enabled():
+    if not EOD_ARCHIVE_DIR:
+        return False
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def archive_path(dataset, day):
+    return os.path.join(EOD_ARCHIVE_DIR, dataset, f"{day.isoformat()}.parquet")
+
+def coerce_numeric(df):
+    """Converts object columns that hold only numbers (e.g. '1,234.50') to numeric dtypes."""
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        values = df[col]
+        converted = pd.to_numeric(values.astype(str).str.replace(",", "").str.strip(), errors="coerce")
+        if converted.notna().sum() == values.notna().sum() and values.notna().any():
+            df[col] = converted
+    return df
+
+def eod_frame(dataset, date):
+    """
+    EOD_SOURCES dataset for one date: archive file if present, else fetched via the frame cache
+    and — for past dates — written to the archive so later range/screener calls read it locally.
+    """
+    try:
+        day = parse_nse_date(date)
+    except (TypeError, ValueError, AttributeError):
+        return source_frame(dataset, date=date)
+
+    if archive_enabled():
+        path = archive_path(dataset, day)
+        if os.path.exists(path):
+            return pd.read_parquet(path)
+
+    df = source_frame(dataset, date=format_nse_date(day))
+    if archive_enabled() and isinstance(df, pd.DataFrame) and not df.empty and day < dt.date.today():
+        path = archive_path(dataset, day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            df.astype({c: "string" for c in df.columns[df.dtypes == object]}).to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    return df
+
+def trading_holidays():
+    """
+    Set of NSE trading holidays. NSE only publishes the current calendar year, so holidays in
+    other years are unknown here (see trading_days).
+    """
+    data = cached_frame("trading_holidays", lambda: get.nse_trading_holidays(list_only=True), ttl=EOD_CACHE_TTL)
+    if isinstance(data, pd.DataFrame):
+        col = date_column(data)
+        values = data[col] if col is not None else data.iloc[:, 0]
+    else:
+        values = pd.Series(list(data or []))
+    return {d.date() for d in parse_dates(values.astype(str)).dropna()}
+
+def trading_days(start, end):
+    """
+    Weekdays in [start, end] that are not NSE trading holidays. Holidays are only known for the
+    current calendar year; in earlier years every weekday is returned, and callers report holidays
+    as days without data.
+    """
+    try:
+        holidays = trading_holidays()
+    except Exception:
+        holidays = set()
+    return [d.date() for d in pd.bdate_range(start, end) if d.date() not in holidays]
+
+# ================================================================
+#                   BACKGROUND JOBS (market-hours pollers)
+# ================================================================
+
+IST = dt.timezone(dt.timedelta(hours=5, minutes=30))
+MARKET_OPEN = dt.time(9, 15)
+MARKET_CLOSE = dt.time(15, 30)
+
+background_jobs = {}   # name → status dict (reported on GET /stats)
+
+def is_market_hours(now=None):
+    """True between 09:15 and 15:30 IST on trading days."""
+    now = now or dt.datetime.now(IST)
+    if now.weekday() >= 5 or not (MARKET_OPEN <= now.time() <= MARKET_CLOSE):
+        return False
+    try:
+        return now.date() not in trading_holidays()
+    except Exception:
+        return True
+
+def start_background_job(name, interval, job, market_hours_only=True):
+    """
+    Runs job() every `interval` seconds on a daemon thread (outside market hours it idles
+    when market_hours_only). Failures are counted in the job status, never raised.
+    """
+    if name in background_jobs:
+        return background_jobs[name]
+    status = {"interval": interval, "runs": 0, "errors": 0, "last_run": None, "last_error": None}
+    background_jobs[name] = status
+
+    def loop():
+        while True:
+            started = time.monotonic()
+            if not market_hours_only or is_market_hours():
+                try:
+                    job()
+                    status["runs"] += 1
+                    status["last_run"] = dt.datetime.now(IST).isoformat(timespec="seconds")
+                except Exception as e:
+                    status["errors"] += 1
+                    status["last_error"] = f"{type(e).__name__}: {e}"
+            time.sleep(max(1.0, interval - (time.monotonic() - started)))
+
+    Thread(target=loop, name=f"nsekit-{name}", daemon=True).start()
+    return status
+
+def records_frame(data):
+    """
+    NseKit payload (DataFrame, list of records, or dict holding a list of nested records)
+    → flat DataFrame. Nested keys are shortened to their last segment where unambiguous.
+    """
+    if isinstance(data, pd.DataFrame):
+        return data
+    if isinstance(data, dict):
+        data = next((v for v in data.values() if isinstance(v, list) and v and isinstance(v[0], dict)), [data])
+    if not isinstance(data, list):
+        raise ValueError(f"Unsupported payload {type(data).__name__}")
+    df = pd.json_normalize(data, sep=".")
+    short = [str(c).split(".")[-1] for c in df.columns]
+    return df.set_axis([s if short.count(s) == 1 else c for s, c in zip(short, df.columns)], axis=1)
+
+# ================================================================
+#                   LIVE SNAPSHOT VERSIONS (delta responses)
+# ================================================================
+
+SNAPSHOT_HISTORY = int(os.environ.get("MCP_SNAPSHOT_HISTORY", "16"))
+
+# Row keys used to align consecutive snapshots; one column is picked per group.
+INDICES_KEYS = (("indexSymbol", "index", "Index"),)
+CONSTITUENT_KEYS = (("symbol", "Symbol"),)
+OPTION_CHAIN_KEYS = (
+    ("expiryDate", "Expiry Date", "expiry", "EXPIRY_DT"),
+    ("strikePrice", "Strike Price", "strike", "STRIKE_PR"),
+)
+
+# Columns carrying one value for the whole payload (fetch time, broadcast underlying price); they change
+# on every refresh, so they are reported once in the delta header instead of flagging every row.
+SNAPSHOT_WIDE_COLUMNS = ("Fetch_Time", "Underlying_Value", "Symbol")
+
+_snapshots = {}   # stream → OrderedDict(version → keyed frame)
+_snapshot_lock = Lock()
+_snapshot_versions = itertools.count(1)
+
+def _keyed(df, key_groups):
+    keys = [c for c in (find_column(df, group) for group in key_groups) if c is not None]
+    if keys:
+        keyed = df.set_index(keys, drop=False)
+        if keyed.index.is_unique:
+            return keyed
+    return df.reset_index(drop=True)
+
+def record_snapshot(stream, df, key_groups=()):
+    """Stores df as the latest snapshot of `stream`; unchanged data keeps its version id."""
+    keyed = _keyed(df, key_groups)
+    with _snapshot_lock:
+        history = _snapshots.setdefault(stream, OrderedDict())
+        if history:
+            last_version, last = next(reversed(history.items()))
+            if last.equals(keyed):
+                return last_version, keyed
+        version = next(_snapshot_versions)
+        history[version] = keyed
+        while len(history) > SNAPSHOT_HISTORY:
+            history.popitem(last=False)
+    return version, keyed
+
+def snapshot_wide_columns(keyed):
+    """SNAPSHOT_WIDE_COLUMNS present in keyed that are not row keys and hold a single value."""
+    cols = [find_column(keyed, (c,)) for c in SNAPSHOT_WIDE_COLUMNS]
+    return [
+        c for c in dict.fromkeys(cols)
+        if c is not None and c not in keyed.index.names and keyed[c].nunique(dropna=False) <= 1
+    ]
+
+def frame_delta(old, new, shared=()):
+    """
+    Vectorized diff of two keyed snapshots → (changed/added rows, removed keys, unchanged count), or None.
+    `shared` columns are left out of the row comparison and of the returned rows.
+    """
+    if not old.columns.equals(new.columns):
+        return None
+    new = new.drop(columns=list(shared))
+    old = old.drop(columns=list(shared))
+    both = new.index.intersection(old.index)
+    a = new.loc[both].to_numpy()
+    b = old.loc[both].to_numpy()
+    changed = ((a != b) & ~(pd.isna(a) & pd.isna(b))).any(axis=1)
+    added = new.index.difference(old.index)
+    rows = new.loc[both[changed].append(added)]
+    removed = old.index.difference(new.index)
+    return rows, removed, int(len(both) - changed.sum())
+
+def delta_response(stream, df, key_groups, since_version):
+    """
+    Response for `since_version` polling: rows changed or added since that version,
+    keys removed since then and the new version id. Unknown/expired versions get a full snapshot.
+    """
+    version, keyed = record_snapshot(stream, df, key_groups)
+    with _snapshot_lock:
+        base = _snapshots.get(stream, {}).get(since_version)
+
+    shared = snapshot_wide_columns(keyed)
+    delta = frame_delta(base, keyed, shared) if base is not None else None
+    if delta is None:
+        return {"version": version, "full": True, "rows": json_safe(df)}
+
+    rows, removed, unchanged = delta
+    if isinstance(removed, pd.MultiIndex):
+        removed = [dict(zip(removed.names, k)) for k in removed]
+    else:
+        removed = removed.tolist()
+    return {
+        "version": version,
+        "since_version": since_version,
+        "full": False,
+        **({"snapshot": json_safe(keyed[shared].head(1))[0]} if shared and len(keyed) else {}),
+        "changed": json_safe(rows),
+        "removed": removed,
+        "unchanged": unchanged,
+    }
+
+# ================================================================
+#                   PAYLOAD BUDGET (opt-in summarization)
+# ================================================================
+
+# 0 disables the corresponding budget; both default to disabled.
+PAYLOAD_MAX_BYTES = int(os.environ.get("MCP_PAYLOAD_MAX_BYTES", "0"))
+PAYLOAD_MAX_ROWS = int(os.environ.get("MCP_PAYLOAD_MAX_ROWS", "0"))
+PAYLOAD_TOP_N = int(os.environ.get("MCP_PAYLOAD_TOP_N", "10"))
+
+def _estimated_json_bytes(df, sample_rows=200):
+    if df.empty:
+        return 2
+    sample = df.head(sample_rows)
+    sample_bytes = len(json.dumps(sample.to_dict(orient="records"), default=str))
+    return int(sample_bytes * len(df) / len(sample))
+
+def over_payload_budget(df):
+    if PAYLOAD_MAX_ROWS and len(df) > PAYLOAD_MAX_ROWS:
+        return True
+    return bool(PAYLOAD_MAX_BYTES) and _estimated_json_bytes(df) > PAYLOAD_MAX_BYTES
+
+def summarize_frame(df, key_candidates=(), top_n=PAYLOAD_TOP_N):
+    """Per-column statistics plus the top-N rows by the first matching numeric key column."""
+    numeric = df.select_dtypes("number")
+    columns = {}
+    if not numeric.empty:
+        desc = numeric.describe().T.round(4)
+        for col, row in desc.iterrows():
+            columns[str(col)] = {k: (None if pd.isna(v) else float(v)) for k, v in row.items()}
+    for col in df.columns.difference(numeric.columns, sort=False):
+        s = df[col]
+        mode = s.mode(dropna=True)
+        columns[str(col)] = {
+            "count": int(s.count()),
+            "unique": int(s.nunique(dropna=True)),
+            "top": None if mode.empty else str(mode.iloc[0]),
+        }
+
+    key = find_column(numeric, key_candidates) if not numeric.empty else None
+    top = df.loc[numeric[key].nlargest(top_n).index] if key is not None else df.head(top_n)
+    return {
+        "rows": len(df),
+        "columns": columns,
+        "top_by": str(key) if key is not None else None,
+        "top": json_safe(top),
+    }
+
+def budgeted(name, data, params, key_candidates=(), full=False):
+    """
+    Returns data as JSON records, or — when an opt-in payload budget is configured and
+    exceeded — a compact summary with a pointer to the full result.
+    """
+    if full or not isinstance(data, pd.DataFrame) or not over_payload_budget(data):
+        return df_to_json(data)
+
+    params = {k: v for k, v in params.items() if v is not None}
+    summary = summarize_frame(data, key_candidates)
+    summary["summarized"] = True
+    summary["budget"] = {"max_rows": PAYLOAD_MAX_ROWS or None, "max_bytes": PAYLOAD_MAX_BYTES or None}
+    summary["full_data"] = {"tool": name, "arguments": dict(params, full=True)}
+    if name in FRAME_SOURCES and set(params) <= set(inspect.signature(FRAME_SOURCES[name][0]).parameters):
+        query = urlencode({**{k: str(v).lower() if isinstance(v, bool) else v for k, v in params.items()},
+                           "format": "parquet"})
+        summary["full_data"]["export"] = f"/export/{name}?{query}"
+    return summary
+
 # =====================================================================
 # MARKET STATUS & TRADING INFO
 # =====================================================================
@@ -72,8 +690,7 @@ def market_live_status(mode: str = "Market Status"):
     CATEGORY:
         NSE_Live
     """
-    rate_limit()
-    return df_to_json(get.nse_market_status(mode))
+    return df_to_json(source_frame("market_live_status", mode=mode))
 
 @mcp.tool()
 def market_is_open(segment: str = "Capital Market"):
@@ -300,22 +917,151 @@ def list_of_indices():
     return get.list_of_indices()
 
 @mcp.tool()
-def indices_live_data():
+def indices_live_data(since_version: int = None):
     """
     TOOL: indices_live_data
     DESCRIPTION:
         Live values(open, high, low, close(last),variation,percentChange,yearHigh,yearLow,pe,pb,dy,declines,advances,unchanged) of all 150+ NSE indices.
         NSE indices performance analysis best tool (highly recommended).
+    PARAMETERS:
+        since_version: int – Optional. For polling: pass 0 first, then the returned "version";
+                             only indices changed since that version are returned.
     RETURNS:
-        JSON list
+        JSON list (or {version, full, rows | changed, removed} when since_version is given)
     CATEGORY:
         Index_Live
     """
-    rate_limit()
-    return df_to_json(get.index_live_all_indices_data())
+    data = latest_indices_snapshot()
+    if data is None:
+        data = source_frame("indices_live_data")
+    if since_version is not None and isinstance(data, pd.DataFrame):
+        return delta_response("indices_live_data", data, INDICES_KEYS, since_version)
+    return df_to_json(data)
+
+
+# ---------------------------------------------------------------------
+# Index ring buffer (fed by the background indices poller)
+# ---------------------------------------------------------------------
+
+INDEX_POLL_INTERVAL = float(os.environ.get("MCP_INDEX_POLL_INTERVAL", "0"))   # 0 = poller off
+INDEX_RING_SIZE = int(os.environ.get("MCP_INDEX_RING_SIZE", "512"))
+INDEX_RING_FIELDS = ("last", "variation", "percentChange", "open", "high", "low", "advances", "declines")
+
+_index_ring = {
+    "names": [],                                   # index names along axis 1
+    "positions": {},                               # name → column in values
+    "times": np.zeros(INDEX_RING_SIZE, dtype="datetime64[s]"),
+    "values": np.full((INDEX_RING_SIZE, 0, len(INDEX_RING_FIELDS)), np.nan),
+    "count": 0,                                    # snapshots written so far
+    "latest": None,                                # last raw frame (served by indices_live_data)
+    "latest_at": 0.0,
+}
+_index_ring_lock = Lock()
+
+def push_indices_snapshot(df, when=None):
+    """Appends one indices_live_data frame to the ring buffer (O(indices) copy, no reallocation per poll)."""
+    key = find_column(df, INDICES_KEYS[0])
+    if key is None:
+        raise ValueError("indices_live_data has no index name column")
+    names = df[key].astype(str).str.upper().to_numpy()
+    fields = np.column_stack([
+        pd.to_numeric(df[f], errors="coerce").to_numpy(dtype=float) if f in df.columns
+        else np.full(len(df), np.nan)
+        for f in INDEX_RING_FIELDS
+    ])
+    when = np.datetime64(when or dt.datetime.now(IST).replace(tzinfo=None), "s")
+
+    with _index_ring_lock:
+        ring = _index_ring
+        new = [n for n in dict.fromkeys(names) if n not in ring["positions"]]
+        if new:
+            for n in new:
+                ring["positions"][n] = len(ring["names"])
+                ring["names"].append(n)
+            pad = np.full((INDEX_RING_SIZE, len(new), len(INDEX_RING_FIELDS)), np.nan)
+            ring["values"] = np.concatenate([ring["values"], pad], axis=1)
+        slot = ring["count"] % INDEX_RING_SIZE
+        row = np.full((len(ring["names"]), len(INDEX_RING_FIELDS)), np.nan)
+        row[[ring["positions"][n] for n in names]] = fields
+        ring["values"][slot] = row
+        ring["times"][slot] = when
+        ring["count"] += 1
+        ring["latest"], ring["latest_at"] = df, time.time()
+
+def poll_indices():
+    df = cached_frame("indices_live_data", lambda: get.index_live_all_indices_data(), ttl=0)
+    if isinstance(df, pd.DataFrame) and not df.empty:
+        push_indices_snapshot(df)
+
+def latest_indices_snapshot():
+    """Latest polled frame in O(1), or None when the poller is off or its data is stale."""
+    with _index_ring_lock:
+        fresh = INDEX_POLL_INTERVAL and time.time() - _index_ring["latest_at"] < 3 * INDEX_POLL_INTERVAL
+        return _index_ring["latest"] if fresh else None
+
+def index_ring_view():
+    """(times, values[snapshot, index, field], names) in chronological order."""
+    with _index_ring_lock:
+        n = min(_index_ring["count"], INDEX_RING_SIZE)
+        start = _index_ring["count"] % INDEX_RING_SIZE if _index_ring["count"] > INDEX_RING_SIZE else 0
+        order = (np.arange(n) + start) % INDEX_RING_SIZE
+        return _index_ring["times"][order], _index_ring["values"][order], list(_index_ring["names"])
+
+@mcp.tool()
+def index_intraday_momentum(indices: list[str] = None, windows: list[int] = None, top_n: int = None):
+    """
+    TOOL: index_intraday_momentum
+    DESCRIPTION:
+        Intraday momentum of NSE indices: % change of the index value over the last 5/15/30 minutes
+        (or custom windows), computed from the server's polled snapshot buffer – no upstream call.
+        Requires the indices poller (MCP_INDEX_POLL_INTERVAL > 0). Only the current trading day's
+        snapshots are used; a window longer than the session so far is null.
+    PARAMETERS:
+        indices: list[str] – Optional filter, e.g. ["NIFTY 50", "NIFTY BANK", "NIFTY IT"] (default all)
+        windows: list[int] – Look-back windows in minutes (default [5, 15, 30])
+        top_n: int – Optional: only the top N by the first window's change
+    RETURNS:
+        Rows of index, last, percentChange, chg_5m, chg_15m, chg_30m, ... sorted by the first window
+    CATEGORY:
+        Index_Live
+    """
+    windows = windows or [5, 15, 30]
+    times, values, names = index_ring_view()
+    if len(times) == 0:
+        return {"error": "Index poller has no snapshots yet (set MCP_INDEX_POLL_INTERVAL and wait for market hours)"}
+    # Windows never reach back into a previous session (times are IST wall-clock)
+    session = int(np.searchsorted(times, times[-1].astype("datetime64[D]"), side="left"))
+    times, values = times[session:], values[session:]
+
+    last_col = INDEX_RING_FIELDS.index("last")
+    now_values = values[-1, :, last_col]
+    out = pd.DataFrame({
+        "index": names,
+        "last": now_values,
+        "percentChange": values[-1, :, INDEX_RING_FIELDS.index("percentChange")],
+    })
+    for minutes in windows:
+        target = times[-1] - np.timedelta64(int(minutes * 60), "s")
+        pos = int(np.searchsorted(times, target, side="right")) - 1
+        if pos < 0 or pos == len(times) - 1:
+            out[f"chg_{minutes}m"] = np.nan
+            continue
+        out[f"chg_{minutes}m"] = np.round((now_values / values[pos, :, last_col] - 1.0) * 100.0, 4)
+
+    if indices:
+        wanted = {i.strip().upper() for i in indices}
+        out = out[out["index"].isin(wanted)]
+    out = out.sort_values(f"chg_{windows[0]}m", ascending=False, na_position="last")
+    if top_n:
+        out = out.head(top_n)
+    return {
+        "as_of": str(times[-1]),
+        "snapshots": len(times),
+        "rows": json_safe(out.reset_index(drop=True)),
+    }
 
 @mcp.tool()
-def index_live_constituents(index_name: str, list_only: bool = False):
+def index_live_constituents(index_name: str, list_only: bool = False, since_version: int = None):
     """
     TOOL: index_live_constituents
     DESCRIPTION:
@@ -344,13 +1090,99 @@ def index_live_constituents(index_name: str, list_only: bool = False):
             "NIFTY REALTY",
             "NIFTY500 HEALTHCARE"  (for more index_name use list_of_indices() tool)
         list_only: bool – Return only symbols if True, otherwise full data
+        since_version: int – Optional. For polling: pass 0 first, then the returned "version";
+                             only stocks changed since that version are returned.
     RETURNS:
-        JSON constituents
+        JSON constituents (or {version, full, rows | changed, removed} when since_version is given)
     CATEGORY:
         Index_Live
     """
-    rate_limit()
-    return df_to_json(get.index_live_indices_stocks_data(index_name, list_only=list_only))
+    data = source_frame("index_live_constituents", index_name=index_name, list_only=list_only)
+    if since_version is not None and isinstance(data, pd.DataFrame):
+        stream = f"index_live_constituents:{index_name.upper()}"
+        return delta_response(stream, data, CONSTITUENT_KEYS, since_version)
+    return df_to_json(data)
+
+
+def constituents_long(index_names, deadline=None):
+    """
+    Constituent snapshots of several indices fetched concurrently (cached and coalesced)
+    → (long frame tagged with "index", errors, timed_out). The index's own summary row is dropped.
+    """
+    names = list(dict.fromkeys(n.strip().upper() for n in index_names if n and n.strip()))
+    results, errors, timed_out = run_parallel(
+        {n: (lambda n=n: source_frame("index_live_constituents", index_name=n, list_only=False)) for n in names},
+        deadline=deadline,
+    )
+    parts = []
+    for name in names:
+        df = results.get(name)
+        if not isinstance(df, pd.DataFrame) or df.empty:
+            if name in results:
+                errors[name] = "No constituent data"
+            continue
+        if "symbol" in df.columns:
+            df = df[df["symbol"].astype(str).str.upper() != name]
+        parts.append(df.assign(index=name))
+    if not parts:
+        return pd.DataFrame(), errors, timed_out
+    long = pd.concat(parts, ignore_index=True)
+    return long[["index"] + [c for c in long.columns if c != "index"]], errors, timed_out
+
+def constituent_aggregates(long):
+    """Per-index breadth, average/median pChange and turnover, computed in one groupby."""
+    change = pd.to_numeric(long["pChange"], errors="coerce") if "pChange" in long.columns else None
+    if change is None:
+        return []
+    value = (pd.to_numeric(long["totalTradedValue"], errors="coerce")
+             if "totalTradedValue" in long.columns else pd.Series(float("nan"), index=long.index))
+    frame = pd.DataFrame({
+        "index": long["index"],
+        "pChange": change,
+        "advances": change > 0,
+        "declines": change < 0,
+        "unchanged": change == 0,
+        "turnover": value,
+    })
+    agg = frame.groupby("index", sort=False).agg(
+        stocks=("pChange", "size"),
+        advances=("advances", "sum"),
+        declines=("declines", "sum"),
+        unchanged=("unchanged", "sum"),
+        avg_pChange=("pChange", "mean"),
+        median_pChange=("pChange", "median"),
+        turnover=("turnover", "sum"),
+    )
+    agg["breadth"] = (agg["advances"] / agg["stocks"].where(agg["stocks"] > 0)).round(4)
+    agg["ad_ratio"] = (agg["advances"] / agg["declines"].where(agg["declines"] > 0)).round(4)
+    agg[["avg_pChange", "median_pChange"]] = agg[["avg_pChange", "median_pChange"]].round(4)
+    return json_safe(agg.reset_index().sort_values("avg_pChange", ascending=False))
+
+@mcp.tool()
+def index_live_constituents_multi(index_names: list[str], aggregates: bool = True, include_rows: bool = True):
+    """
+    TOOL: index_live_constituents_multi
+    DESCRIPTION:
+        Constituents of SEVERAL indices in one call (sector rotation): one long table tagged with "index",
+        plus optional per-index aggregates (advances, declines, breadth, avg/median pChange, turnover).
+        Indices are fetched concurrently and share the cache with index_live_constituents.
+    PARAMETERS:
+        index_names: list[str] – e.g. ["NIFTY AUTO", "NIFTY IT", "NIFTY PHARMA", "NIFTY METAL"]
+                                 (same names as index_live_constituents; see list_of_indices())
+        aggregates: bool – Include per-index aggregates, ranked by avg pChange (default True)
+        include_rows: bool – Include the constituent rows (set False for aggregates only)
+    RETURNS:
+        {"rows": [...], "aggregates": [...], "errors": {index: message}, "timed_out": [indices]}
+    CATEGORY:
+        Index_Live
+    """
+    long, errors, timed_out = constituents_long(index_names, deadline=60)
+    result = {"errors": errors, "timed_out": timed_out}
+    if include_rows:
+        result["rows"] = json_safe(long) if not long.empty else []
+    if aggregates:
+        result["aggregates"] = constituent_aggregates(long) if not long.empty else []
+    return result
 
 
 # =====================================================================
@@ -462,7 +1294,7 @@ def list_of_All_NSE_stocks(list_only: bool = False):
 # =====================================================================
 
 @mcp.tool()
-def fno_live_option_chain(symbol: str, expiry: str = None, compact: bool = False):
+def fno_live_option_chain(symbol: str, expiry: str = None, compact: bool = False, since_version: int = None):
     """
     TOOL: fno_live_option_chain
     DESCRIPTION:
@@ -471,8 +1303,11 @@ def fno_live_option_chain(symbol: str, expiry: str = None, compact: bool = False
         symbol: str – "RELIANCE", "NIFTY", "BANKNIFTY"
         expiry: str – Optional "DD-MMM-YYYY"
         compact: bool – Compact OI view
+        since_version: int – Optional. For polling: pass 0 first, then the returned "version";
+                             only strikes changed since that version are returned (Fetch_Time,
+                             Underlying_Value and Symbol come once under "snapshot").
     RETURNS:
-        Complete option chain JSON
+        Complete option chain JSON (or {version, full, rows | snapshot, changed, removed} when since_version is given)
     CATEGORY:
         FnO_Live
     EXAMPLES:
@@ -481,9 +1316,11 @@ def fno_live_option_chain(symbol: str, expiry: str = None, compact: bool = False
         (get.fno_live_option_chain("RELIANCE", expiry_date="28-Oct-2025"))    Option chain with specific expiry
         (get.fno_live_option_chain("RELIANCE", oi_mode="compact"))           Compact option chain data
     """
-    rate_limit()
-    mode = "compact" if compact else None
-    return df_to_json(get.fno_live_option_chain(symbol, expiry_date=expiry, oi_mode=mode))
+    data = source_frame("fno_live_option_chain", symbol=symbol, expiry=expiry, compact=compact)
+    if since_version is not None and isinstance(data, pd.DataFrame):
+        stream = f"fno_live_option_chain:{symbol.upper()}:{expiry}:{compact}"
+        return delta_response(stream, data, OPTION_CHAIN_KEYS, since_version)
+    return df_to_json(data)
 
 @mcp.tool()
 def fno_expiry_dates(symbol: str = "NIFTY", filter_type: str = None):
@@ -510,8 +1347,7 @@ def fno_expiry_dates(symbol: str = "NIFTY", filter_type: str = None):
         (get.fno_expiry_dates("TCS", "Current"))                 # TCS Current Expiry Date only
         (get.fno_expiry_dates("TCS", "Month"))                   # TCS Next Month Expiry Date only
     """
-    rate_limit()
-    return df_to_json(get.fno_expiry_dates(symbol, filter_type))
+    return df_to_json(expiry_dates(symbol, filter_type))
 
 @mcp.tool()
 def fno_expiry_dates_and_strikePrice(symbol: str = "NIFTY"):
@@ -551,6 +1387,447 @@ def most_active_options(contract_type: str = "Stock", option_type: str = "Call",
     return df_to_json(get.fno_live_most_active(contract_type, option_type, sort_by))
 
 
+# Selector → NseKit label filter; "all" reads the unfiltered table (its "All" filter is only the three labelled dates)
+EXPIRY_SELECTORS = {"all": None, "current": "Current", "next": "Next Week", "monthly": "Month"}
+OPTION_SIDES = {"ce": "CE", "call": "CE", "calls": "CE", "pe": "PE", "put": "PE", "puts": "PE"}
+# Canonical long-table field names for the many spellings of option chain columns
+CHAIN_FIELDS = {
+    "oi": "openInterest", "openinterest": "openInterest",
+    "chnginoi": "changeinOpenInterest", "changeinoi": "changeinOpenInterest",
+    "changeinopeninterest": "changeinOpenInterest", "pchangeinopeninterest": "pchangeinOpenInterest",
+    "volume": "totalTradedVolume", "totaltradedvolume": "totalTradedVolume",
+    "iv": "impliedVolatility", "impliedvolatility": "impliedVolatility",
+    "ltp": "lastPrice", "lastprice": "lastPrice",
+    "chng": "change", "netchng": "change", "change": "change", "pchange": "pChange",
+    "bidqty": "bidQty", "bidprice": "bidPrice", "bid": "bidPrice",
+    "askqty": "askQty", "askprice": "askPrice", "ask": "askPrice",
+}
+STRIKE_COLUMNS = ("strikePrice", "Strike Price", "strike", "STRIKE_PR", "Strike")
+CHAIN_DROPPED_COLUMNS = ("Symbol", "Fetch_Time")   # raw duplicates of the long table's symbol / payload metadata
+
+def expiry_dates(symbol, filter_type=None):
+    """Cached fno_expiry_dates lookup (the expiry calendar changes at most daily)."""
+    return cached_frame(
+        "fno_expiry_dates", lambda symbol, filter_type=None: get.fno_expiry_dates(symbol, filter_type),
+        ttl=HISTORY_CACHE_TTL, symbol=symbol.upper(), **({"filter_type": filter_type} if filter_type else {}),
+    )
+
+def resolve_expiries(symbol, selector="current"):
+    """
+    Expiry selector ("all" | "current" | "next" | "monthly" | "DD-MM-YYYY") → list of expiry dates.
+    "all" is every active expiry; raises ValueError when NseKit has no expiry calendar for the symbol.
+    """
+    selector = (selector or "current").strip()
+    if selector.lower() not in EXPIRY_SELECTORS:
+        try:
+            return [parse_nse_date(selector)]
+        except ValueError:
+            return [dt.datetime.strptime(selector, "%d-%b-%Y").date()]
+    data = expiry_dates(symbol, EXPIRY_SELECTORS[selector.lower()])
+    if isinstance(data, pd.DataFrame):
+        col = find_column(data, ("Expiry Date", "expiryDate", "expiry"))
+        data = data[col if col is not None else data.columns[0]].tolist()
+    values = data if isinstance(data, (list, tuple)) else [data]
+    dates = [d.date() for d in parse_dates(pd.Series([str(v) for v in values if v])).dropna()]
+    if not dates:
+        raise ValueError(f"No expiry dates for {symbol.upper()} (selector '{selector}')")
+    return sorted(set(dates))
+
+def _chain_side(column):
+    """'CE_OI' / 'CALLS_Chng in OI' / 'CE.openInterest' / 'OI_PE' → (side, canonical field) or (None, column)."""
+    tokens = [t for t in re.split(r"[_\s.\-]+", str(column)) if t]
+    if len(tokens) > 1:
+        for pos, rest in ((0, tokens[1:]), (-1, tokens[:-1])):
+            side = OPTION_SIDES.get(tokens[pos].lower())
+            if side:
+                key = re.sub(r"[^a-z]", "", "".join(rest).lower())
+                return side, CHAIN_FIELDS.get(key, "".join(rest))
+    return None, column
+
+def normalize_option_chain(df, symbol=None, expiry=None):
+    """
+    Wide option chain (CE/PE columns side by side) → long table:
+    symbol, expiry, strike, option_type, openInterest, changeinOpenInterest, totalTradedVolume,
+    impliedVolatility, lastPrice, ... plus any shared columns (e.g. underlyingValue).
+    """
+    strike_col = find_column(df, STRIKE_COLUMNS)
+    expiry_col = find_column(df, OPTION_CHAIN_KEYS[0])
+    symbol_col = find_column(df, ("Symbol",))
+    if symbol is None and symbol_col is not None and len(df):
+        symbol = str(df[symbol_col].iloc[0]).upper()
+    dropped = {find_column(df, (c,)) for c in CHAIN_DROPPED_COLUMNS}
+    sides, shared = {"CE": {}, "PE": {}}, []
+    for col in df.columns:
+        side, field = _chain_side(col)
+        if side:
+            sides[side][col] = field
+        elif col not in (strike_col, expiry_col) and col not in dropped:
+            shared.append(col)
+    if strike_col is None or not (sides["CE"] or sides["PE"]):
+        raise ValueError("Unrecognized option chain layout")
+
+    base = pd.DataFrame({
+        "symbol": symbol,
+        "expiry": parse_dates(df[expiry_col].astype(str)) if expiry_col else pd.Timestamp(expiry),
+        "strike": pd.to_numeric(df[strike_col], errors="coerce"),
+    }, index=df.index)
+    parts = [
+        pd.concat([base, df[list(mapping)].rename(columns=mapping), df[shared]], axis=1).assign(option_type=side)
+        for side, mapping in sides.items() if mapping
+    ]
+    long = coerce_numeric(pd.concat(parts, ignore_index=True))
+    lead = ["symbol", "expiry", "strike", "option_type"]
+    return long[lead + [c for c in long.columns if c not in lead]].dropna(subset=["strike"])
+
+def option_chain_long(symbol, expiry):
+    """One symbol/expiry chain from the shared live cache, in normalized long form."""
+    symbol = symbol.upper()
+    data = source_frame("fno_live_option_chain", symbol=symbol, expiry=expiry.strftime("%d-%b-%Y"), compact=False)
+    if not isinstance(data, pd.DataFrame) or data.empty:
+        raise ValueError(f"No option chain for {symbol} {expiry:%d-%b-%Y}")
+    return normalize_option_chain(data, symbol, expiry)
+
+def option_chains(symbols, expiries="current", deadline=None):
+    """
+    Chains for every (symbol, expiry) pair fetched concurrently within the rate budget
+    → (long frame, {symbol: [expiries]}, errors, timed_out).
+    """
+    resolved, errors = {}, {}
+    for symbol in dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()):
+        try:
+            resolved[symbol] = resolve_expiries(symbol, expiries)
+        except Exception as e:
+            errors[symbol] = f"{type(e).__name__}: {e}"
+    tasks = {
+        f"{symbol} {expiry:%d-%b-%Y}": (lambda s=symbol, e=expiry: option_chain_long(s, e))
+        for symbol, dates in resolved.items() for expiry in dates
+    }
+    results, failures, timed_out = run_parallel(tasks, deadline=deadline)
+    errors.update(failures)
+    frames = [results[k] for k in tasks if k in results]
+    long = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return long, {s: [format_nse_date(d) for d in v] for s, v in resolved.items()}, errors, timed_out
+
+@mcp.tool()
+def fno_option_chains(symbols: list[str], expiries: str = "current", deadline_seconds: float = 60.0, full: bool = False):
+    """
+    TOOL: fno_option_chains
+    DESCRIPTION:
+        Option chains for SEVERAL symbols and expiries in one call (term structure / skew analysis).
+        Returns one normalized long table: symbol, expiry, strike, option_type (CE/PE),
+        openInterest, changeinOpenInterest, totalTradedVolume, impliedVolatility, lastPrice, ...
+    PARAMETERS:
+        symbols: list[str] – e.g. ["NIFTY", "BANKNIFTY", "FINNIFTY"]
+        expiries: str – "all" | "current" | "next" | "monthly" | a specific "DD-MM-YYYY"
+        deadline_seconds: float – Return whatever is ready after this long
+        full: bool – Return every row even if the server payload budget is exceeded
+    RETURNS:
+        {"rows": [...] (or summary), "expiries": {symbol: [dates]}, "errors": {...}, "timed_out": [...]}
+    CATEGORY:
+        FnO_Live
+    EXAMPLES:
+        fno_option_chains(["NIFTY", "BANKNIFTY"], expiries="all")
+    """
+    long, resolved, errors, timed_out = option_chains(symbols, expiries, deadline=deadline_seconds)
+    params = dict(symbols=symbols, expiries=expiries)
+    return {
+        "rows": budgeted("fno_option_chains", long, params, key_candidates=("openInterest",), full=full),
+        "expiries": resolved,
+        "errors": errors,
+        "timed_out": timed_out,
+    }
+
+
+# =====================================================================
+# OPTION ANALYTICS (vectorized Black-76 Greeks / implied volatility)
+# =====================================================================
+
+OPTION_RISK_FREE_RATE = float(os.environ.get("MCP_RISK_FREE_RATE", "0.065"))
+IV_BOUNDS = (0.005, 5.0)
+IV_TOLERANCE = 1e-6
+IV_MAX_ITER = 50
+EXPIRY_TIME = dt.time(15, 30)
+UNDERLYING_COLUMNS = ("underlyingValue", "underlying_value", "Underlying Value", "underlyingPrice")
+
+def norm_cdf(x):
+    """Standard normal CDF via the Abramowitz–Stegun erf approximation (|error| < 1.5e-7, no SciPy needed)."""
+    x = np.asarray(x, dtype=float)
+    z = np.abs(x) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.sign(x) * erf)
+
+def norm_pdf(x):
+    return np.exp(-0.5 * np.square(x)) / np.sqrt(2.0 * np.pi)
+
+def black76(forward, strike, years, sigma, rate, is_call):
+    """Black-76 price and vega (per 1.00 of vol) for arrays of contracts."""
+    sqrt_t = np.sqrt(years)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1 = (np.log(forward / strike) + 0.5 * sigma * sigma * years) / (sigma * sqrt_t)
+    d2 = d1 - sigma * sqrt_t
+    discount = np.exp(-rate * years)
+    call = discount * (forward * norm_cdf(d1) - strike * norm_cdf(d2))
+    put = discount * (strike * norm_cdf(-d2) - forward * norm_cdf(-d1))
+    return np.where(is_call, call, put), discount * forward * norm_pdf(d1) * sqrt_t
+
+def implied_volatility(price, forward, strike, years, rate, is_call, guess=None):
+    """
+    Batched IV solver: Newton steps on every contract at once, safeguarded by a shrinking
+    bisection bracket so steps that leave the bracket (or hit zero vega) fall back to bisection.
+    Prices outside the no-arbitrage bounds give NaN.
+    """
+    price, forward, strike, years = (np.asarray(a, dtype=float) for a in (price, forward, strike, years))
+    discount = np.exp(-rate * years)
+    intrinsic = discount * np.maximum(np.where(is_call, forward - strike, strike - forward), 0.0)
+    upper = discount * np.where(is_call, forward, strike)
+    valid = np.isfinite(price) & (price > intrinsic) & (price < upper) & (years > 0)
+
+    lo, hi = np.full(price.shape, IV_BOUNDS[0]), np.full(price.shape, IV_BOUNDS[1])
+    # Brenner–Subrahmanyam starting point unless a guess (e.g. the exchange IV) is supplied
+    with np.errstate(divide="ignore", invalid="ignore"):
+        start = np.sqrt(2.0 * np.pi / years) * price / (discount * forward)
+    if guess is not None:
+        guess = np.asarray(guess, dtype=float)
+        start = np.where(np.isfinite(guess) & (guess > 0), guess, start)
+    sigma = np.clip(np.nan_to_num(start, nan=0.3), *IV_BOUNDS)
+
+    active = valid.copy()
+    for _ in range(IV_MAX_ITER):
+        if not active.any():
+            break
+        model, vega = black76(forward, strike, years, sigma, rate, is_call)
+        diff = model - price
+        active &= np.abs(diff) > IV_TOLERANCE
+        hi = np.where(active & (diff > 0), sigma, hi)
+        lo = np.where(active & (diff < 0), sigma, lo)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = sigma - diff / vega
+        bisect = ~np.isfinite(step) | (step <= lo) | (step >= hi)
+        sigma = np.where(active, np.where(bisect, 0.5 * (lo + hi), step), sigma)
+    return np.where(valid, sigma, np.nan)
+
+def chain_forward(chain, years, rate):
+    """
+    Forward per (symbol, expiry): put–call parity at the strike where |C − P| is smallest,
+    falling back to underlyingValue · e^(rT) when one side has no price.
+    """
+    underlying_col = find_column(chain, UNDERLYING_COLUMNS)
+    spot = pd.to_numeric(chain[underlying_col], errors="coerce") if underlying_col else pd.Series(np.nan, index=chain.index)
+    carry = spot * np.exp(rate * years)
+
+    keys = ["symbol", "expiry"]
+    sides = chain.pivot_table(index=keys + ["strike"], columns="option_type", values="lastPrice", aggfunc="first")
+    if {"CE", "PE"} <= set(sides.columns):
+        sides = sides[(sides["CE"] > 0) & (sides["PE"] > 0)].reset_index()
+        sides["gap"] = (sides["CE"] - sides["PE"]).abs()
+        atm = sides.loc[sides.groupby(keys)["gap"].idxmin()] if not sides.empty else sides
+        expiry_years = chain.groupby(keys)["years"].first()
+        atm = atm.join(expiry_years, on=keys)
+        atm["parity"] = atm["strike"] + np.exp(rate * atm["years"]) * (atm["CE"] - atm["PE"])
+        parity = chain[keys].join(atm.set_index(keys)["parity"], on=keys)["parity"]
+        return parity.fillna(carry)
+    return carry
+
+def option_greeks(chain, rate=OPTION_RISK_FREE_RATE, solve_iv=True, now=None):
+    """
+    Enrich a normalized long option chain with: years (to 15:30 IST on expiry), forward, iv
+    (solved from lastPrice, or NSE's impliedVolatility), delta, gamma, theta (per calendar day),
+    vega (per 1 vol point). Everything is computed as whole-array NumPy operations.
+    """
+    if chain.empty:
+        return chain
+    out = chain.copy()
+    now = now or dt.datetime.now(IST).replace(tzinfo=None)
+    expiry_close = pd.to_datetime(out["expiry"]).dt.normalize() + pd.Timedelta(hours=EXPIRY_TIME.hour, minutes=EXPIRY_TIME.minute)
+    out["years"] = ((expiry_close - now).dt.total_seconds() / (365.0 * 86400)).clip(lower=1.0 / (365 * 24 * 60))
+    out["forward"] = chain_forward(out, out["years"], rate)
+
+    forward, strike, years = (out[c].to_numpy(dtype=float) for c in ("forward", "strike", "years"))
+    is_call = (out["option_type"] == "CE").to_numpy()
+    exchange_iv = None
+    if "impliedVolatility" in out.columns:
+        exchange_iv = pd.to_numeric(out["impliedVolatility"], errors="coerce").to_numpy(dtype=float) / 100.0
+    if solve_iv and "lastPrice" in out.columns:
+        sigma = implied_volatility(out["lastPrice"].to_numpy(dtype=float), forward, strike, years, rate, is_call, guess=exchange_iv)
+    else:
+        sigma = exchange_iv if exchange_iv is not None else np.full(len(out), np.nan)
+    sigma = np.where(sigma > 0, sigma, np.nan)
+
+    sqrt_t = np.sqrt(years)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1 = (np.log(forward / strike) + 0.5 * sigma * sigma * years) / (sigma * sqrt_t)
+        discount = np.exp(-rate * years)
+        price, vega = black76(forward, strike, years, sigma, rate, is_call)
+        pdf = norm_pdf(d1)
+        out["iv"] = sigma * 100.0
+        out["delta"] = np.where(is_call, discount * norm_cdf(d1), -discount * norm_cdf(-d1))
+        out["gamma"] = discount * pdf / (forward * sigma * sqrt_t)
+        out["theta"] = (-discount * forward * pdf * sigma / (2.0 * sqrt_t) + rate * price) / 365.0
+        out["vega"] = vega / 100.0
+    return out.round({"years": 6, "forward": 2, "iv": 2, "delta": 4, "gamma": 6, "theta": 4, "vega": 4})
+
+@mcp.tool()
+def fno_option_greeks(symbols: list[str], expiries: str = "current", rate: float = None, solve_iv: bool = True,
+                      deadline_seconds: float = 60.0, full: bool = False):
+    """
+    TOOL: fno_option_greeks
+    DESCRIPTION:
+        Option chains enriched with server-computed Black-76 Greeks and implied volatility for every strike
+        and expiry (vectorized; a full NIFTY chain takes milliseconds). The forward is implied from put–call
+        parity at the ATM strike, so index and stock options are priced consistently.
+    PARAMETERS:
+        symbols: list[str] – e.g. ["NIFTY"] or ["NIFTY", "BANKNIFTY", "RELIANCE"]
+        expiries: str – "all" (every active expiry NSE lists) | "current" | "next" | "monthly" | a specific "DD-MM-YYYY"
+        rate: float – Annual risk-free rate (default MCP_RISK_FREE_RATE, 0.065)
+        solve_iv: bool – Solve IV from lastPrice (True) or use NSE's published IV (False)
+        deadline_seconds: float – Return whatever is ready after this long
+        full: bool – Return every row even if the server payload budget is exceeded
+    RETURNS:
+        {"rows": [... strike, option_type, lastPrice, forward, iv, delta, gamma, theta, vega ...],
+         "expiries": {symbol: [resolved expiries]}, "errors": {...}, "timed_out": [...]}
+        theta is per calendar day, vega per 1 IV point, iv in percent. Expiries whose chain failed or
+        timed out appear under errors / timed_out and have no rows.
+    CATEGORY:
+        FnO_Live
+    EXAMPLES:
+        fno_option_greeks(["NIFTY"])
+        fno_option_greeks(["BANKNIFTY"], expiries="all", solve_iv=False)
+    """
+    long, resolved, errors, timed_out = option_chains(symbols, expiries, deadline=deadline_seconds)
+    enriched = option_greeks(long, OPTION_RISK_FREE_RATE if rate is None else rate, solve_iv)
+    params = dict(symbols=symbols, expiries=expiries, rate=rate, solve_iv=solve_iv)
+    return {
+        "rows": budgeted("fno_option_greeks", enriched, params, key_candidates=("openInterest",), full=full),
+        "expiries": resolved,
+        "errors": errors,
+        "timed_out": timed_out,
+    }
+
+
+# ---------------------------------------------------------------------
+# Max pain / PCR / OI walls (memoized per live chain snapshot)
+# ---------------------------------------------------------------------
+
+_chain_analytics = BoundedMemo()   # (symbol, expiry, top_n) → (raw chain frame it was computed from, result)
+
+def max_pain(strikes, call_oi, put_oi):
+    """
+    Settlement strike minimizing total option-writer payout, in O(strikes) with prefix sums:
+    calls pay Σ_{K_i<S} c_i (S − K_i), puts pay Σ_{K_i>S} p_i (K_i − S).
+    Returns (max pain strike, payout per strike).
+    """
+    order = np.argsort(strikes)
+    k, c, p = (np.asarray(a, dtype=float)[order] for a in (strikes, call_oi, put_oi))
+    call_pay = k * np.cumsum(c) - np.cumsum(c * k)
+    put_pay = np.cumsum((p * k)[::-1])[::-1] - k * np.cumsum(p[::-1])[::-1]
+    payout = call_pay + put_pay
+    return float(k[np.argmin(payout)]), payout
+
+def weighted_strike_stats(strikes, weights):
+    """OI-weighted mean, std and 25/50/75% quantiles of strikes."""
+    w = np.asarray(weights, dtype=float)
+    total = w.sum()
+    if total <= 0:
+        return None
+    k = np.asarray(strikes, dtype=float)
+    mean = float((k * w).sum() / total)
+    cum = np.cumsum(w) / total
+    q25, q50, q75 = (float(k[min(np.searchsorted(cum, q), len(k) - 1)]) for q in (0.25, 0.5, 0.75))
+    return {"mean": round(mean, 2), "std": round(float(np.sqrt((w * (k - mean) ** 2).sum() / total)), 2),
+            "q25": q25, "median": q50, "q75": q75}
+
+def expiry_oi_analytics(symbol, expiry, top_n=3):
+    """Max pain, PCR, OI walls and OI-weighted strike distribution for one symbol/expiry chain."""
+    symbol = symbol.upper()
+    raw = source_frame("fno_live_option_chain", symbol=symbol, expiry=expiry.strftime("%d-%b-%Y"), compact=False)
+    if not isinstance(raw, pd.DataFrame) or raw.empty:
+        raise ValueError(f"No option chain for {symbol} {expiry:%d-%b-%Y}")
+    key = (symbol, expiry, top_n)
+    entry = _chain_analytics.get(key)
+    if entry is not None and entry[0] is raw:
+        return entry[1]
+
+    chain = normalize_option_chain(raw, symbol, expiry)
+    if "openInterest" not in chain.columns:
+        raise ValueError(f"Option chain for {symbol} has no open interest")
+    table = chain.pivot_table(
+        index="strike", columns="option_type", aggfunc="sum", fill_value=0,
+        values=[c for c in ("openInterest", "changeinOpenInterest", "totalTradedVolume") if c in chain.columns],
+    ).sort_index()
+    side = lambda field, opt: table[(field, opt)] if (field, opt) in table.columns else pd.Series(0.0, index=table.index)
+    strikes = table.index.to_numpy(dtype=float)
+    call_oi, put_oi = side("openInterest", "CE"), side("openInterest", "PE")
+    call_vol, put_vol = side("totalTradedVolume", "CE"), side("totalTradedVolume", "PE")
+    pain, _ = max_pain(strikes, call_oi, put_oi)
+
+    def walls(oi, change):
+        top = oi.nlargest(top_n)
+        return [{"strike": float(k), "oi": int(v), "change_in_oi": int(change.get(k, 0))} for k, v in top.items() if v > 0]
+
+    underlying_col = find_column(chain, UNDERLYING_COLUMNS)
+    result = {
+        "expiry": format_nse_date(expiry),
+        "underlying": float(pd.to_numeric(chain[underlying_col], errors="coerce").dropna().iloc[0])
+        if underlying_col and chain[underlying_col].notna().any() else None,
+        "max_pain": pain,
+        "pcr_oi": round(put_oi.sum() / call_oi.sum(), 3) if call_oi.sum() else None,
+        "pcr_volume": round(put_vol.sum() / call_vol.sum(), 3) if call_vol.sum() else None,
+        "call_oi": int(call_oi.sum()),
+        "put_oi": int(put_oi.sum()),
+        "resistance_walls": walls(call_oi, side("changeinOpenInterest", "CE")),
+        "support_walls": walls(put_oi, side("changeinOpenInterest", "PE")),
+        "call_oi_distribution": weighted_strike_stats(strikes, call_oi),
+        "put_oi_distribution": weighted_strike_stats(strikes, put_oi),
+    }
+    _chain_analytics.put(key, (raw, result))
+    return result
+
+@mcp.tool()
+def fno_option_analytics(symbol: str, expiries: str = "all", top_n: int = 3, deadline_seconds: float = 60.0):
+    """
+    TOOL: fno_option_analytics
+    DESCRIPTION:
+        Max pain, PCR (by OI and by volume), top OI walls (support / resistance) and the OI-weighted
+        strike distribution for every active expiry of a symbol in one call. Results are reused until
+        the underlying live chain refreshes.
+    PARAMETERS:
+        symbol: str – e.g. "NIFTY", "BANKNIFTY", "RELIANCE"
+        expiries: str – "all" (every active expiry NSE lists) | "current" | "next" | "monthly" | a specific "DD-MM-YYYY"
+        top_n: int – OI walls returned per side
+        deadline_seconds: float – Return whatever is ready after this long
+    RETURNS:
+        {"symbol", "expiries": [{expiry, underlying, max_pain, pcr_oi, pcr_volume, call_oi, put_oi,
+          resistance_walls, support_walls, call_oi_distribution, put_oi_distribution}], "pcr_oi_all",
+         "resolved_expiries", "covered_expiries", "errors", "timed_out"}
+        pcr_oi_all aggregates covered_expiries only; resolved expiries missing from it are under errors / timed_out.
+    CATEGORY:
+        FnO_Live
+    EXAMPLES:
+        fno_option_analytics("NIFTY")
+        fno_option_analytics("BANKNIFTY", expiries="current", top_n=5)
+    """
+    symbol = symbol.strip().upper()
+    try:
+        dates = resolve_expiries(symbol, expiries)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    tasks = {format_nse_date(d): (lambda d=d: expiry_oi_analytics(symbol, d, top_n)) for d in dates}
+    results, errors, timed_out = run_parallel(tasks, deadline=deadline_seconds)
+    rows = [results[k] for k in tasks if k in results]
+    call_oi, put_oi = sum(r["call_oi"] for r in rows), sum(r["put_oi"] for r in rows)
+    return {
+        "symbol": symbol,
+        "expiries": rows,
+        "pcr_oi_all": round(put_oi / call_oi, 3) if call_oi else None,
+        "resolved_expiries": list(tasks),
+        "covered_expiries": [r["expiry"] for r in rows],
+        "errors": errors,
+        "timed_out": timed_out,
+    }
+
+
 # =====================================================================
 # EQUITY LIVE DATA
 # =====================================================================
@@ -599,8 +1876,7 @@ def equity_volume_surge():
     CATEGORY:
         Equity_Live
     """
-    rate_limit()
-    return df_to_json(get.cm_live_volume_spurts())
+    return df_to_json(source_frame("equity_volume_surge"))
 
 @mcp.tool()
 def equity_52week_high_live():
@@ -613,8 +1889,7 @@ def equity_52week_high_live():
     CATEGORY:
         Equity_Live
     """
-    rate_limit()
-    return df_to_json(get.cm_live_52week_high())
+    return df_to_json(source_frame("equity_52week_high_live"))
 
 @mcp.tool()
 def equity_52week_low_live():
@@ -627,8 +1902,7 @@ def equity_52week_low_live():
     CATEGORY:
         Equity_Live
     """
-    rate_limit()
-    return df_to_json(get.cm_live_52week_low())
+    return df_to_json(source_frame("equity_52week_low_live"))
 
 
 # =====================================================================
@@ -667,8 +1941,9 @@ def corporate_actions(symbol: str = None, period: str = None, start_date: str =
     CATEGORY:
         Corporate_Events
     """
-    rate_limit()
-    return df_to_json(get.cm_live_hist_corporate_action(symbol, period, start_date, end_date, purpose))
+    return df_to_json(source_frame(
+        "corporate_actions", symbol=symbol, period=period, start_date=start_date, end_date=end_date, purpose=purpose,
+    ))
 
 @mcp.tool()
 def corporate_board_meetings(symbol: str = None, start_date: str = None, end_date: str = None):
@@ -759,12 +2034,139 @@ def index_price_history(index: str, period: str = None, from_date: str = None, t
         index_price_history("NIFTY BANK", from_date="01-01-2025", to_date="17-10-2025")
     """
     
-    rate_limit()
-    return df_to_json(get.index_historical_data(index=index, period=period, from_date=from_date, to_date=to_date))
-
+    return df_to_json(source_frame("index_price_history", index=index, period=period, from_date=from_date, to_date=to_date))
+
+
+# ---------------------------------------------------------------------
+# Corporate-action adjustment factors
+# ---------------------------------------------------------------------
+
+ACTION_SUBJECT_COLUMNS = ("subject", "SUBJECT", "purpose", "PURPOSE")
+ACTION_EX_DATE_COLUMNS = ("exDate", "EX-DATE", "ex_date", "Ex Date", "EXDATE")
+ADJUST_PRICE_COLUMNS = (
+    "CH_OPENING_PRICE", "CH_TRADE_HIGH_PRICE", "CH_TRADE_LOW_PRICE", "CH_CLOSING_PRICE", "CH_LAST_TRADED_PRICE",
+    "CH_PREVIOUS_CLS_PRICE", "VWAP", "CH_52WEEK_HIGH_PRICE", "CH_52WEEK_LOW_PRICE",
+    "Open Price", "High Price", "Low Price", "Close Price", "Last Price", "Prev Close", "Average Price",
+)
+ADJUST_QUANTITY_COLUMNS = ("CH_TOT_TRADED_QTY", "Total Traded Quantity", "COP_DELIV_QTY", "Deliverable Qty")
+_RUPEES = r"(?:rs|re|inr|₹)\.?\s*"
+
+_adjustment_indices = BoundedMemo()   # symbol → (corporate-action fingerprint, factor index)
+
+def parse_corporate_action(subject):
+    """Subject text → ("split" | "bonus", share ratio) or ("dividend", rupees per share) or None."""
+    text = str(subject).lower()
+    try:
+        if "split" in text or "sub-division" in text:
+            m = re.search(rf"from\s*(?:{_RUPEES})?([\d.]+).*?to\s*(?:{_RUPEES})?([\d.]+)", text)
+            if m and float(m.group(1)) > 0:
+                return "split", float(m.group(2)) / float(m.group(1))
+        if "bonus" in text:
+            m = re.search(r"bonus\D*?(\d+)\s*:\s*(\d+)", text)
+            if m:
+                new, held = int(m.group(1)), int(m.group(2))
+                return "bonus", held / (new + held)
+        if "dividend" in text:
+            amounts = [float(a) for a in re.findall(rf"{_RUPEES}(\d+(?:\.\d+)?)", text)]
+            if amounts:
+                return "dividend", sum(amounts)
+    except ValueError:
+        pass
+    return None
+
+def closes_before(symbol, days):
+    """
+    Closing price on the last trading day before each of `days` → {day: close or None}, from ONE
+    history fetch spanning all of them (the cached chunks are shared with the history tools).
+    """
+    days = sorted(set(days))
+    if not days:
+        return {}
+    history, _, _ = bulk_history([symbol], from_date=format_nse_date(days[0] - dt.timedelta(days=14)),
+                                 to_date=format_nse_date(days[-1] - dt.timedelta(days=1)))
+    col = find_column(history, OHLCV_COLUMNS["close"]) if not history.empty else None
+    date_col = date_column(history) if col else None
+    if date_col is None:
+        return dict.fromkeys(days)
+    closes = pd.Series(pd.to_numeric(history[col], errors="coerce").to_numpy(),
+                       index=parse_dates(history[date_col])).dropna().sort_index()
+    stamps = closes.index.to_numpy(dtype="datetime64[ns]")
+    pos = np.searchsorted(stamps, np.array(days, dtype="datetime64[ns]"), side="left") - 1
+    return {d: float(closes.iloc[p]) if p >= 0 else None for d, p in zip(days, pos)}
+
+def adjustment_index(symbol):
+    """
+    Per-symbol factor index: ex_date, kind, price_factor (all actions) and share_factor (splits/bonus).
+    Built from the full corporate-action history and rebuilt only when that history changes.
+    """
+    symbol = symbol.strip().upper()
+    empty = pd.DataFrame(columns=["ex_date", "kind", "value", "price_factor", "share_factor"])
+    raw = source_frame(
+        "corporate_actions", symbol=symbol, start_date="01-01-2000", end_date=format_nse_date(dt.date.today()),
+    )
+    # None / empty / non-tabular payloads are what NseKit returns for a symbol without actions
+    if is_empty_result(raw):
+        return empty
+    try:
+        actions = records_frame(raw)
+    except ValueError:
+        return empty
+    subject_col, ex_col = find_column(actions, ACTION_SUBJECT_COLUMNS), find_column(actions, ACTION_EX_DATE_COLUMNS)
+    if actions.empty or subject_col is None or ex_col is None:
+        return empty
+    fingerprint = tuple(sorted(zip(actions[ex_col].astype(str), actions[subject_col].astype(str))))
+    cached = _adjustment_indices.get(symbol)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    parsed_actions = [
+        (ex_date, parsed)
+        for ex_date, parsed in zip(parse_dates(actions[ex_col].astype(str)), map(parse_corporate_action, actions[subject_col]))
+        if parsed is not None and not pd.isna(ex_date) and ex_date.date() <= dt.date.today()
+    ]
+    prev_closes = closes_before(symbol, [ex.date() for ex, (kind, _) in parsed_actions if kind == "dividend"])
+
+    rows = []
+    for ex_date, (kind, value) in parsed_actions:
+        if kind == "dividend":
+            prev_close = prev_closes.get(ex_date.date())
+            if not prev_close or value >= prev_close:
+                continue
+            rows.append((ex_date, kind, value, 1 - value / prev_close, 1.0))
+        else:
+            rows.append((ex_date, kind, value, value, value))
+    index = pd.DataFrame(rows, columns=empty.columns).sort_values("ex_date", ignore_index=True) if rows else empty
+    _adjustment_indices.put(symbol, (fingerprint, index))
+    return index
+
+def apply_adjustments(df, index):
+    """
+    Multiplies every bar dated before an ex-date by that action's factor (cumulative over all later
+    actions): prices by price_factor, traded/deliverable quantities by 1 / share_factor.
+    """
+    col = date_column(df)
+    if col is None or index.empty:
+        return df.assign(adj_factor=1.0)
+    dates = parse_dates(df[col]).to_numpy(dtype="datetime64[ns]")
+    ex_dates = index["ex_date"].to_numpy(dtype="datetime64[ns]")
+    # cumulative product of factors of actions at or after position i (1.0 past the last action)
+    price_cum = np.append(np.cumprod(index["price_factor"].to_numpy(dtype=float)[::-1])[::-1], 1.0)
+    share_cum = np.append(np.cumprod(index["share_factor"].to_numpy(dtype=float)[::-1])[::-1], 1.0)
+    pos = np.searchsorted(ex_dates, dates, side="right")
+    price_factor, share_factor = price_cum[pos], share_cum[pos]
+
+    out = df.copy()
+    for c in ADJUST_PRICE_COLUMNS:
+        if c in out.columns:
+            out[c] = (pd.to_numeric(out[c], errors="coerce") * price_factor).round(2)
+    for c in ADJUST_QUANTITY_COLUMNS:
+        if c in out.columns:
+            out[c] = (pd.to_numeric(out[c], errors="coerce") / share_factor).round(0)
+    return out.assign(adj_factor=np.round(price_factor, 6))
 
 @mcp.tool()
-def equity_price_history(symbol: str, period: str = None, from_date: str = None, to_date: str = None):
+def equity_price_history(symbol: str, period: str = None, from_date: str = None, to_date: str = None, full: bool = False,
+                         adjusted: bool = False):
     """
     TOOL: equity_price_history
     DESCRIPTION:
@@ -774,8 +2176,11 @@ def equity_price_history(symbol: str, period: str = None, from_date: str = None,
         period: str – Shortcut period ("1D","1W","1M","3M","6M","1Y","2Y","5Y","10Y","YTD","MAX")
         from_date: str – Start date in DD-MM-YYYY (optional)
         to_date: str – End date in DD-MM-YYYY (optional)
+        full: bool – Return every row even if the server payload budget is exceeded
+        adjusted: bool – Back-adjust prices (and share quantities) for splits, bonuses and dividends
+                         using corporate_actions; adds an "adj_factor" column
     RETURNS:
-        JSON with daily OHLCV + turnover + delivery
+        JSON with daily OHLCV + turnover + delivery (or a compact summary when over the payload budget)
     CATEGORY:
         Historical
     EXAMPLES:
@@ -784,8 +2189,15 @@ def equity_price_history(symbol: str, period: str = None, from_date: str = None,
         stock_history("TCS", from_date="01-01-2025", to_date="17-10-2025")
     """
 
-    rate_limit()
-    return df_to_json(get.cm_hist_security_wise_data(symbol=symbol, period=period, from_date=from_date, to_date=to_date))
+    params = dict(symbol=symbol, period=period, from_date=from_date, to_date=to_date)
+    data = source_frame("equity_price_history", **params)
+    if adjusted and isinstance(data, pd.DataFrame) and not data.empty:
+        data = apply_adjustments(data, adjustment_index(symbol))
+        params["adjusted"] = True
+    return budgeted(
+        "equity_price_history", data, params,
+        key_candidates=("CH_TOT_TRADED_QTY", "TotalTradedQuantity", "Volume", "CH_TOT_TRADED_VAL"), full=full,
+    )
 
 
 # =====================================================================
@@ -889,9 +2301,8 @@ def index_eod_bhavcopy(date: str):
     CATEGORY:
         Index_EOD
     """
-    rate_limit()
     # Original: get.index_eod_bhav_copy("17-10-2025")
-    return df_to_json(get.index_eod_bhav_copy(date))
+    return df_to_json(eod_frame("index_eod_bhavcopy", date))
 
 
 @mcp.tool()
@@ -968,9 +2379,105 @@ def equity_live_stock_info(symbol: str):
     CATEGORY:
         CM_Live
     """
-    rate_limit()
     # Original: get.cm_live_equity_info("RELIANCE")
-    return (get.cm_live_equity_full_info(symbol))
+    return cached_frame("equity_live_stock_info", lambda symbol: get.cm_live_equity_full_info(symbol),
+                        ttl=LIVE_CACHE_TTL, symbol=symbol.upper())
+
+
+# Uniform batch-quote columns → candidate field names (snapshot columns or flattened quote keys)
+QUOTE_FIELDS = {
+    "lastPrice": ("lastPrice", "priceInfo.lastPrice", "LTP"),
+    "change": ("change", "priceInfo.change"),
+    "pChange": ("pChange", "priceInfo.pChange"),
+    "previousClose": ("previousClose", "priceInfo.previousClose", "prevClose"),
+    "open": ("open", "priceInfo.open"),
+    "dayHigh": ("dayHigh", "priceInfo.intraDayHighLow.max", "high"),
+    "dayLow": ("dayLow", "priceInfo.intraDayHighLow.min", "low"),
+    "totalTradedVolume": ("totalTradedVolume", "marketDeptOrderBook.tradeInfo.totalTradedVolume",
+                          "preOpenMarket.totalTradedVolume"),
+    "totalTradedValue": ("totalTradedValue", "marketDeptOrderBook.tradeInfo.totalTradedValue"),
+    "yearHigh": ("yearHigh", "priceInfo.weekHighLow.max"),
+    "yearLow": ("yearLow", "priceInfo.weekHighLow.min"),
+}
+QUOTE_SNAPSHOT_INDICES = [
+    i.strip() for i in os.environ.get("MCP_QUOTE_SNAPSHOT_INDICES", "NIFTY 500").split(",") if i.strip()
+]
+
+def _quote_from_info(symbol, info):
+    """Maps a per-symbol live quote (nested dict or frame) onto QUOTE_FIELDS."""
+    if isinstance(info, pd.DataFrame):
+        flat = info.iloc[0].to_dict() if not info.empty else {}
+    elif isinstance(info, dict):
+        flat = pd.json_normalize(info, sep=".").iloc[0].to_dict()
+    else:
+        raise ValueError(f"unexpected quote payload {type(info).__name__}")
+
+    by_suffix = {str(k).split(".")[-1].lower(): v for k, v in flat.items()}
+    lowered = {str(k).lower(): v for k, v in flat.items()}
+    row = {"symbol": symbol, "source": "quote"}
+    for field, candidates in QUOTE_FIELDS.items():
+        row[field] = next(
+            (lowered[c.lower()] for c in candidates if c.lower() in lowered),
+            by_suffix.get(field.lower()),
+        )
+    return row
+
+@mcp.tool()
+def equity_live_quotes(symbols: list[str], deadline_seconds: float = 20.0):
+    """
+    TOOL: equity_live_quotes
+    DESCRIPTION:
+        Live quotes for many stocks in one call (watchlists). Uniform table:
+        symbol, lastPrice, change, pChange, previousClose, open, dayHigh, dayLow,
+        totalTradedVolume, totalTradedValue, yearHigh, yearLow, source.
+        Symbols found in a shared index snapshot (NIFTY 500 by default) cost no extra upstream calls;
+        the rest are fetched in parallel per symbol.
+    PARAMETERS:
+        symbols: list[str] – e.g. ["RELIANCE", "TCS", "INFY"]
+        deadline_seconds: float – Return whatever is ready after this many seconds (default 20)
+    RETURNS:
+        {"rows": [...], "errors": {symbol: message}, "timed_out": [symbols],
+         "snapshot_errors": {index: message}}  (index snapshots that failed or missed the deadline)
+    CATEGORY:
+        CM_Live
+    """
+    started = time.monotonic()
+    wanted = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+    rows = {}
+
+    snapshots, snapshot_errors, snapshot_late = run_parallel(
+        {index_name: (lambda i=index_name: source_frame("index_live_constituents", index_name=i, list_only=False))
+         for index_name in (QUOTE_SNAPSHOT_INDICES if wanted else [])},
+        deadline=deadline_seconds,
+    )
+    snapshot_errors.update({index_name: "timed out" for index_name in snapshot_late})
+    for index_name in QUOTE_SNAPSHOT_INDICES:
+        snapshot = snapshots.get(index_name)
+        if len(rows) == len(wanted):
+            break
+        if not isinstance(snapshot, pd.DataFrame) or "symbol" not in snapshot.columns:
+            continue
+        hits = snapshot[snapshot["symbol"].astype(str).str.upper().isin(set(wanted) - set(rows))]
+        columns = [c for c in QUOTE_FIELDS if c in hits.columns]
+        for rec in hits[["symbol"] + columns].to_dict(orient="records"):
+            sym = str(rec.pop("symbol")).upper()
+            rows[sym] = dict({f: None for f in QUOTE_FIELDS}, symbol=sym, source=f"snapshot:{index_name}", **rec)
+
+    missing = [s for s in wanted if s not in rows]
+    remaining = max(0.0, deadline_seconds - (time.monotonic() - started))
+    results, failures, timed_out = run_parallel(
+        {s: (lambda s=s: _quote_from_info(s, equity_live_stock_info(s))) for s in missing},
+        deadline=remaining,
+    )
+    rows.update(results)
+
+    ordered = pd.DataFrame([rows[s] for s in wanted if s in rows])
+    return {
+        "rows": json_safe(ordered) if not ordered.empty else [],
+        "errors": failures,
+        "timed_out": timed_out,
+        "snapshot_errors": snapshot_errors,
+    }
 
 
 @mcp.tool()
@@ -991,7 +2498,7 @@ def equity_block_deals_live():
 
 
 @mcp.tool()
-def corporate_announcement(symbol: str = None, from_date: str = None, to_date: str = None):
+def corporate_announcement(symbol: str = None, from_date: str = None, to_date: str = None, full: bool = False):
     """
     TOOL: corporate_announcement
     DESCRIPTION:
@@ -1000,14 +2507,15 @@ def corporate_announcement(symbol: str = None, from_date: str = None, to_date: s
         symbol: str – optional, e.g., "RELIANCE"
         from_date: str – "DD-MM-YYYY"
         to_date: str – "DD-MM-YYYY"
+        full: bool – Return every row even if the server payload budget is exceeded
     RETURNS:
-        Announcement list
+        Announcement list (or a compact summary when over the payload budget)
     CATEGORY:
         CM_Live
     """
-    rate_limit()
     # Original: get.cm_live_hist_corporate_announcement("RELIANCE", "01-01-2025", "15-10-2025")
-    return df_to_json(get.cm_live_hist_corporate_announcement(symbol, from_date, to_date))
+    params = dict(symbol=symbol, from_date=from_date, to_date=to_date)
+    return budgeted("corporate_announcement", source_frame("corporate_announcement", **params), params, full=full)
 
 
 @mcp.tool()
@@ -1301,8 +2809,7 @@ def fno_live_most_active_underlying():
     CATEGORY:
         FnO_Live
     """
-    rate_limit()
-    return df_to_json(get.fno_live_most_active_underlying())
+    return df_to_json(source_frame("fno_live_most_active_underlying"))
 
 
 @mcp.tool()
@@ -1317,8 +2824,7 @@ def fno_live_change_in_oi():
     CATEGORY:
         FnO_Live
     """
-    rate_limit()
-    return df_to_json(get.fno_live_change_in_oi())
+    return df_to_json(source_frame("fno_live_change_in_oi"))
 
 @mcp.tool()
 def fno_live_oi_vs_price():
@@ -1354,6 +2860,175 @@ def fno_live_active_contracts(symbol: str = "NIFTY", expiry_date: str = None):
     return df_to_json(get.fno_live_active_contracts(symbol, expiry_date=expiry_date))
 
 
+# ---------------------------------------------------------------------
+# Intraday F&O scanner (server-side version of intraday_scanner_fno_only)
+# ---------------------------------------------------------------------
+
+FNO_UNIVERSE_INDEX = "SECURITIES IN F&O"
+SCAN_WEIGHTS = {"volume": 0.3, "oi": 0.25, "momentum": 0.2, "options": 0.15, "range": 0.1}
+SCAN_FIELDS = {
+    "volume_ratio": ("week1volChange", "volChange", "volumeRatio", "times"),
+    "volume": ("volume", "totalTradedVolume"),
+    "avg_volume": ("week1AvgVolume", "avgVolume", "week2AvgVolume"),
+    "oi_change_pct": ("pChangeInOI", "pchangeinOpenInterest", "changeInOIPercent", "avgInOI", "pctChangeOI"),
+    "oi_change": ("changeInOI", "changeinOpenInterest", "chngInOI"),
+    "prev_oi": ("prevOI", "previousOI", "earlierOI"),
+    "options_value": ("optionsValue", "optValue", "totOptValue", "premiumTurnover", "totalValue", "value"),
+}
+BUILDUPS = {(True, True): "Long buildup", (False, True): "Short buildup",
+            (True, False): "Short covering", (False, False): "Long unwinding"}
+
+def _symbol_frame(data, fields):
+    """records → one row per symbol with the requested SCAN_FIELDS (missing fields are NaN)."""
+    df = records_frame(data)
+    sym = find_column(df, ("symbol", "underlying", "Symbol"))
+    if sym is None or df.empty:
+        return pd.DataFrame(columns=fields).rename_axis("symbol")
+    out = pd.DataFrame({"symbol": df[sym].astype(str).str.strip().str.upper()})
+    for field in fields:
+        col = find_column(df, SCAN_FIELDS[field])
+        out[field] = pd.to_numeric(df[col], errors="coerce") if col else np.nan
+    return out.groupby("symbol").first()
+
+def fno_scan_frame(deadline=None):
+    """
+    Joins the shared live snapshots (F&O constituents, volume surge, change in OI, most active
+    underlyings) on symbol → (frame with evidence columns, errors, timed_out).
+    """
+    sources = {
+        "universe": lambda: source_frame("index_live_constituents", index_name=FNO_UNIVERSE_INDEX, list_only=False),
+        "volume_surge": lambda: source_frame("equity_volume_surge"),
+        "change_in_oi": lambda: source_frame("fno_live_change_in_oi"),
+        "options": lambda: source_frame("fno_live_most_active_underlying"),
+    }
+    results, errors, timed_out = run_parallel(sources, deadline=deadline)
+    if "universe" not in results:
+        raise ValueError(errors.get("universe", "F&O universe unavailable"))
+
+    base = records_frame(results["universe"])
+    sym = find_column(base, ("symbol",))
+    base = base.assign(symbol=base[sym].astype(str).str.strip().str.upper())
+    base = base[base["symbol"] != FNO_UNIVERSE_INDEX].drop_duplicates("symbol").set_index("symbol")
+    quote = pd.DataFrame(index=base.index)
+    for field in ("lastPrice", "pChange", "open", "dayHigh", "dayLow", "totalTradedVolume", "totalTradedValue"):
+        col = find_column(base, (field,))
+        quote[field] = pd.to_numeric(base[col], errors="coerce") if col else np.nan
+
+    parts = [quote]
+    if "volume_surge" in results:
+        parts.append(_symbol_frame(results["volume_surge"], ("volume_ratio", "volume", "avg_volume")))
+    if "change_in_oi" in results:
+        parts.append(_symbol_frame(results["change_in_oi"], ("oi_change_pct", "oi_change", "prev_oi")))
+    if "options" in results:
+        parts.append(_symbol_frame(results["options"], ("options_value",)))
+    df = parts[0].join(parts[1:], how="left") if len(parts) > 1 else quote
+    for col in ("volume_ratio", "volume", "avg_volume", "oi_change_pct", "oi_change", "prev_oi", "options_value"):
+        if col not in df.columns:
+            df[col] = np.nan
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df["volume_ratio"] = df["volume_ratio"].fillna(df["volume"] / df["avg_volume"])
+        df["oi_change_pct"] = df["oi_change_pct"].fillna(100 * df["oi_change"] / df["prev_oi"])
+        span = df["dayHigh"] - df["dayLow"]
+        df["range_position"] = ((df["lastPrice"] - df["dayLow"]) / span).where(span > 0)
+    return df, errors, timed_out
+
+def score_fno_scan(df, weights=None):
+    """
+    Percentile-rank scoring (0–100): volume expansion, |OI change|, |price change|, option activity,
+    and where price sits in the day's range relative to the trade direction.
+    """
+    weights = {**SCAN_WEIGHTS, **(weights or {})}
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("scan weights must sum to more than zero")
+    rank = lambda s: s.rank(pct=True).fillna(0)
+    long_side = df["pChange"] >= 0
+    alignment = df["range_position"].where(long_side, 1 - df["range_position"]).fillna(0.5)
+    score = (
+        weights["volume"] * rank(df["volume_ratio"])
+        + weights["oi"] * rank(df["oi_change_pct"].abs())
+        + weights["momentum"] * rank(df["pChange"].abs())
+        + weights["options"] * rank(df["options_value"])
+        + weights["range"] * alignment
+    ) / total
+    oi_up = df["oi_change_pct"] > 0
+    buildup = pd.Series([BUILDUPS[(bool(p), bool(o))] for p, o in zip(long_side, oi_up)], index=df.index)
+    return df.assign(
+        direction=np.where(long_side, "Long", "Short"),
+        buildup=buildup.where(df["oi_change_pct"].notna()),
+        score=(100 * score).round(1),
+    )
+
+@mcp.tool()
+def fno_intraday_scan(
+    top_n: int = 15,
+    direction: str = "both",
+    min_volume_ratio: float = None,
+    min_abs_pchange: float = None,
+    require_oi_confirmation: bool = False,
+    weights: dict = None,
+    deadline_seconds: float = 30.0,
+):
+    """
+    TOOL: fno_intraday_scan
+    DESCRIPTION:
+        One-call intraday scanner over ALL F&O stocks (the data pipeline of the intraday_scanner_fno_only prompt).
+        Pulls the F&O universe, volume surge, change in OI and most active underlyings once from the shared
+        live cache, joins them per symbol, scores and ranks candidates, and returns the top N with evidence.
+    PARAMETERS:
+        top_n: int – Candidates returned
+        direction: str – "both" | "long" | "short"
+        min_volume_ratio: float – Minimum volume vs recent average (e.g. 1.5)
+        min_abs_pchange: float – Minimum absolute % price change
+        require_oi_confirmation: bool – Keep only Long buildup (longs) / Short buildup (shorts)
+        weights: dict – Override score weights: volume, oi, momentum, options, range
+        deadline_seconds: float – Return with whatever sources are ready after this long
+    RETURNS:
+        {"candidates": [{symbol, direction, score, lastPrice, pChange, range_position, volume_ratio,
+          oi_change_pct, buildup, options_value, ...}], "universe_size", "errors", "timed_out"}
+    CATEGORY:
+        FnO_Live
+    EXAMPLES:
+        fno_intraday_scan()
+        fno_intraday_scan(top_n=10, direction="long", min_volume_ratio=1.5, require_oi_confirmation=True)
+    """
+    if weights and set(weights) - set(SCAN_WEIGHTS):
+        return {"error": f"weights keys must be among {', '.join(SCAN_WEIGHTS)}"}
+    try:
+        weights = {k: float(v) for k, v in (weights or {}).items()}
+    except (TypeError, ValueError):
+        return {"error": "weights values must be numbers"}
+    if any(v < 0 for v in weights.values()) or sum({**SCAN_WEIGHTS, **weights}.values()) <= 0:
+        return {"error": "weights must be non-negative with at least one above zero"}
+    try:
+        df, errors, timed_out = fno_scan_frame(deadline_seconds)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    scored = score_fno_scan(df, weights)
+
+    keep = pd.Series(True, index=scored.index)
+    if direction.lower() in ("long", "short"):
+        keep &= scored["direction"] == direction.capitalize()
+    if min_volume_ratio is not None:
+        keep &= scored["volume_ratio"] >= min_volume_ratio
+    if min_abs_pchange is not None:
+        keep &= scored["pChange"].abs() >= min_abs_pchange
+    if require_oi_confirmation:
+        keep &= scored["buildup"].isin(["Long buildup", "Short buildup"])
+
+    columns = ["direction", "score", "lastPrice", "pChange", "range_position", "volume_ratio",
+               "oi_change_pct", "buildup", "options_value", "totalTradedValue"]
+    top = scored[keep].nlargest(top_n, "score")[columns].round(
+        {"pChange": 2, "range_position": 2, "volume_ratio": 2, "oi_change_pct": 2})
+    return {
+        "candidates": json_safe(top.reset_index()),
+        "universe_size": len(scored),
+        "errors": errors,
+        "timed_out": timed_out,
+    }
+
+
 # =====================================================================
 #                         EQUITY EOD DATA
 # =====================================================================
@@ -1392,9 +3067,8 @@ def market_eod_activity_report(date: str):
     CATEGORY:
         Equity_EOD
     """
-    rate_limit()
     # Original: get.cm_eod_market_activity_report("17-10-25")
-    return df_to_json(get.cm_eod_market_activity_report(date))
+    return df_to_json(eod_frame("market_eod_activity_report", date))
 
 @mcp.tool()
 def equity_eod_bhavcopy_delivery(date: str):
@@ -1409,9 +3083,8 @@ def equity_eod_bhavcopy_delivery(date: str):
     CATEGORY:
         Equity_EOD
     """
-    rate_limit()
     # Original: get.cm_eod_bhavcopy_with_delivery("17-10-2025")
-    return df_to_json(get.cm_eod_bhavcopy_with_delivery(date))
+    return df_to_json(eod_frame("equity_eod_bhavcopy_delivery", date))
 
 
 @mcp.tool()
@@ -1427,9 +3100,8 @@ def equity_eod_bhavcopy(date: str):
     CATEGORY:
         Equity_EOD
     """
-    rate_limit()
     # Original: get.cm_eod_equity_bhavcopy("17-10-2025")
-    return df_to_json(get.cm_eod_equity_bhavcopy(date))
+    return df_to_json(eod_frame("equity_eod_bhavcopy", date))
 
 
 @mcp.tool()
@@ -1445,9 +3117,8 @@ def equity_52week_high_low_eod(date: str):
     CATEGORY:
         Equity_EOD
     """
-    rate_limit()
     # Original: get.cm_eod_52_week_high_low("17-10-2025")
-    return df_to_json(get.cm_eod_52_week_high_low(date))
+    return df_to_json(eod_frame("equity_52week_high_low_eod", date))
 
 
 @mcp.tool()
@@ -1497,9 +3168,8 @@ def equity_short_selling(date: str):
     CATEGORY:
         Equity_EOD
     """
-    rate_limit()
     # Original: get.cm_eod_shortselling("17-10-2025")
-    return df_to_json(get.cm_eod_shortselling(date))
+    return df_to_json(eod_frame("equity_short_selling", date))
 
 
 @mcp.tool()
@@ -1514,9 +3184,8 @@ def surveillance_indicator(date: str):
     CATEGORY:
         Equity_EOD
     """
-    rate_limit()
     # Original: get.cm_eod_surveillance_indicator("17-10-25")
-    return df_to_json(get.cm_eod_surveillance_indicator(date))
+    return df_to_json(eod_frame("surveillance_indicator", date))
 
 
 @mcp.tool()
@@ -1549,9 +3218,8 @@ def equity_price_band_changes(date: str):
     CATEGORY:
         Equity_EOD
     """
-    rate_limit()
     # Original: get.cm_eod_eq_band_changes("17-10-2025")
-    return df_to_json(get.cm_eod_eq_band_changes(date))
+    return df_to_json(eod_frame("equity_price_band_changes", date))
 
 
 @mcp.tool()
@@ -1567,9 +3235,8 @@ def equity_price_bands(date: str):
     CATEGORY:
         Equity_EOD
     """
-    rate_limit()
     # Original: get.cm_eod_eq_price_band("17-10-2025")
-    return df_to_json(get.cm_eod_eq_price_band(date))
+    return df_to_json(eod_frame("equity_price_bands", date))
 
 
 @mcp.tool()
@@ -1611,9 +3278,8 @@ def equity_pe_ratio(date: str):
     CATEGORY:
         Equity_EOD
     """
-    rate_limit()
     # Original: get.cm_eod_pe_ratio("17-10-25")
-    return df_to_json(get.cm_eod_pe_ratio(date))
+    return df_to_json(eod_frame("equity_pe_ratio", date))
 
 
 @mcp.tool()
@@ -1629,9 +3295,8 @@ def market_cap(date: str):
     CATEGORY:
         Equity_EOD
     """
-    rate_limit()
     # Original: get.cm_eod_mcap("17-10-25")
-    return df_to_json(get.cm_eod_mcap(date))
+    return df_to_json(eod_frame("market_cap", date))
 
 
 @mcp.tool()
@@ -1808,21 +3473,24 @@ def market_advances_declines(mode: str = "Month_wise", month: str = None, year:
 # =====================================================================
 
 @mcp.tool()
-def fno_bhavcopy(date: str):
+def fno_bhavcopy(date: str, full: bool = False):
     """
     TOOL: fno_bhavcopy
     DESCRIPTION:
         Full F&O bhavcopy (futures + options).
     PARAMETERS:
         date: str – "DD-MM-YYYY"    (Note: if user no date given, last trading date is used. if date given, used user date.)
+        full: bool – Return every row even if the server payload budget is exceeded
     RETURNS:
-        Complete F&O closing data
+        Complete F&O closing data (or a compact summary when over the payload budget)
     CATEGORY:
         FnO_EOD
     """
-    rate_limit()
     # Original: get.fno_eod_bhav_copy("17-10-2025")
-    return df_to_json(get.fno_eod_bhav_copy(date))
+    return budgeted(
+        "fno_bhavcopy", eod_frame("fno_bhavcopy", date), {"date": date},
+        key_candidates=("OpnIntrst", "OPEN_INT", "OpenInterest", "TtlTradgVol", "CONTRACTS"), full=full,
+    )
 
 
 @mcp.tool()
@@ -1838,9 +3506,8 @@ def fno_fii_stats(date: str):
     CATEGORY:
         FnO_EOD
     """
-    rate_limit()
     # Original: get.fno_eod_fii_stats("17-10-2025")
-    return df_to_json(get.fno_eod_fii_stats(date))
+    return df_to_json(eod_frame("fno_fii_stats", date))
 
 
 @mcp.tool()
@@ -1856,9 +3523,8 @@ def fno_eod_top10_futures(date: str):
     CATEGORY:
         FnO_EOD
     """
-    rate_limit()
     # Original: get.fno_eod_top10_fut("17-10-2025")
-    return df_to_json(get.fno_eod_top10_fut(date))
+    return df_to_json(eod_frame("fno_eod_top10_futures", date))
 
 
 @mcp.tool()
@@ -1874,9 +3540,8 @@ def fno_eod_top20_options(date: str):
     CATEGORY:
         FnO_EOD
     """
-    rate_limit()
     # Original: get.fno_eod_top20_opt("17-10-2025")
-    return df_to_json(get.fno_eod_top20_opt(date))
+    return df_to_json(eod_frame("fno_eod_top20_options", date))
 
 
 @mcp.tool()
@@ -1892,9 +3557,8 @@ def fno_ban_list(date: str):
     CATEGORY:
         FnO_EOD
     """
-    rate_limit()
     # Original: get.fno_eod_sec_ban("17-10-2025")
-    return df_to_json(get.fno_eod_sec_ban(date))
+    return df_to_json(eod_frame("fno_ban_list", date))
 
 
 @mcp.tool()
@@ -1910,9 +3574,8 @@ def fno_mwpl_data(date: str):
     CATEGORY:
         FnO_EOD
     """
-    rate_limit()
     # Original: get.fno_eod_mwpl_3("17-10-2025")
-    return df_to_json(get.fno_eod_mwpl_3(date))
+    return df_to_json(eod_frame("fno_mwpl_data", date))
 
 
 @mcp.tool()
@@ -1928,9 +3591,8 @@ def fno_combined_oi(date: str):
     CATEGORY:
         FnO_EOD
     """
-    rate_limit()
     # Original: get.fno_eod_combine_oi("17-10-2025")
-    return df_to_json(get.fno_eod_combine_oi(date))
+    return df_to_json(eod_frame("fno_combined_oi", date))
 
 
 @mcp.tool()
@@ -1946,9 +3608,8 @@ def fno_participant_wise_oi(date: str):
     CATEGORY:
         FnO_EOD
     """
-    rate_limit()
     # Original: get.fno_eod_participant_wise_oi("17-10-2025")
-    return df_to_json(get.fno_eod_participant_wise_oi(date))
+    return df_to_json(eod_frame("fno_participant_wise_oi", date))
 
 
 @mcp.tool()
@@ -1964,9 +3625,496 @@ def fno_participant_wise_volume(date: str):
     CATEGORY:
         FnO_EOD
     """
-    rate_limit()
     # Original: get.fno_eod_participant_wise_vol("17-10-2025")
-    return df_to_json(get.fno_eod_participant_wise_vol(date))
+    return df_to_json(eod_frame("fno_participant_wise_volume", date))
+
+
+def eod_range_frames(dataset, from_date, to_date):
+    """Trading days of the range and a per-day loader for one EOD_SOURCES dataset."""
+    if dataset not in EOD_SOURCES:
+        raise ValueError(f"Unknown dataset '{dataset}'. Available: {', '.join(EOD_SOURCES)}")
+    start, end = resolve_date_range(from_date=from_date, to_date=to_date)
+    return trading_days(start, end), lambda day: eod_frame(dataset, day)
+
+def concat_eod(frames):
+    """{date: frame} → one typed frame with a leading trade_date column, in date order."""
+    parts = [
+        df.assign(trade_date=pd.Timestamp(day))
+        for day, df in sorted(frames.items())
+        if isinstance(df, pd.DataFrame) and not df.empty
+    ]
+    if not parts:
+        return pd.DataFrame()
+    df = coerce_numeric(pd.concat(parts, ignore_index=True))
+    return df[["trade_date"] + [c for c in df.columns if c != "trade_date"]]
+
+@mcp.tool()
+async def eod_data_range(dataset: str, from_date: str, to_date: str = None, ctx: Context = None, full: bool = False):
+    """
+    TOOL: eod_data_range
+    DESCRIPTION:
+        Any date-based EOD dataset over a DATE RANGE in one call (e.g. a month of F&O bhavcopies).
+        Weekends and NSE trading holidays are skipped; days already archived are read locally;
+        progress is reported as each day completes. Output is one table with a "trade_date" column.
+        NSE publishes the holiday calendar for the current year only, so holidays in earlier years
+        show up under "missing".
+    PARAMETERS:
+        dataset: str – Name of a single-date EOD tool: "fno_bhavcopy", "equity_eod_bhavcopy_delivery",
+                       "equity_eod_bhavcopy", "index_eod_bhavcopy", "fno_participant_wise_oi",
+                       "fno_participant_wise_volume", "fno_fii_stats", "equity_short_selling",
+                       "surveillance_indicator", "equity_pe_ratio", "market_cap", "fno_combined_oi", ...
+        from_date: str – "DD-MM-YYYY"
+        to_date: str – "DD-MM-YYYY" (default today)
+        full: bool – Return every row even if the server payload budget is exceeded
+    RETURNS:
+        {"data": rows (or summary), "days": n, "missing": [dates with no data], "errors": {date: message}}
+    CATEGORY:
+        EOD_Range
+    EXAMPLES:
+        eod_data_range("fno_participant_wise_oi", "01-09-2025", "30-09-2025")
+    """
+    loop = asyncio.get_running_loop()
+    # resolving trading days may fetch the holiday calendar (blocking NSE call + rate limit)
+    days, load = await loop.run_in_executor(_fetch_pool, eod_range_frames, dataset, from_date, to_date)
+
+    async def fetch(day):
+        try:
+            return day, await loop.run_in_executor(_fetch_pool, load, day), None
+        except Exception as e:
+            return day, None, f"{type(e).__name__}: {e}"
+
+    frames, errors, missing = {}, {}, []
+    for completed, task in enumerate(asyncio.as_completed([fetch(d) for d in days]), start=1):
+        day, df, error = await task
+        if error:
+            errors[format_nse_date(day)] = error
+        elif not isinstance(df, pd.DataFrame) or df.empty:
+            missing.append(format_nse_date(day))
+        else:
+            frames[day] = df
+        if ctx is not None:
+            await ctx.report_progress(completed, len(days), message=f"{dataset} {format_nse_date(day)}")
+
+    params = dict(dataset=dataset, from_date=from_date, to_date=to_date)
+    return {
+        "data": budgeted("eod_data_range", concat_eod(frames), params, full=full),
+        "days": len(frames),
+        "missing": sorted(missing, key=parse_nse_date),
+        "errors": errors,
+    }
+
+
+
+# ---------------------------------------------------------------------
+# Participant positioning time series (participant OI / volume, FII stats)
+# ---------------------------------------------------------------------
+
+POSITIONING_DATASETS = {
+    "oi": "fno_participant_wise_oi",
+    "volume": "fno_participant_wise_volume",
+    "fii_stats": "fno_fii_stats",
+}
+NET_PAIRS = (("long", "short"), ("buy", "sell"))
+
+_positioning_days = BoundedMemo()   # (dataset, date) → tidy frame (immutable once published)
+
+def _snake(name):
+    return re.sub(r"[^a-z0-9]+", "_", str(name).strip().lower()).strip("_")
+
+def positioning_day(dataset, day):
+    """One archived day → frame indexed by participant / category with snake_case numeric columns."""
+    key = (dataset, day)
+    cached = _positioning_days.get(key)
+    if cached is not None:
+        return cached
+    df = eod_frame(dataset, format_nse_date(day))
+    if not isinstance(df, pd.DataFrame) or df.empty:
+        return None
+    df = coerce_numeric(df.rename(columns=_snake))
+    labels = [c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c])]
+    if not labels:
+        raise ValueError(f"{dataset} {format_nse_date(day)}: no participant / category column")
+    tidy = df.set_index(df[labels[0]].astype(str).str.strip().rename("participant"))
+    tidy = tidy.select_dtypes("number")
+    tidy = tidy[~tidy.index.duplicated()]
+    return _positioning_days.put(key, tidy)
+
+def add_net_positions(panel):
+    """For every long/short (or buy/sell) column pair adds <name with net> = long − short."""
+    for col in list(panel.columns):
+        for plus, minus in NET_PAIRS:
+            if re.search(rf"(^|_){plus}(_|$)", col):
+                other = re.sub(rf"(^|_){plus}(_|$)", rf"\g<1>{minus}\g<2>", col)
+                if other in panel.columns:
+                    net = re.sub(rf"(^|_){plus}(_|$)", r"\g<1>net\g<2>", col)
+                    panel[net] = panel[col] - panel[other]
+    return panel
+
+@mcp.tool()
+def fno_participant_positioning(
+    from_date: str,
+    to_date: str = None,
+    dataset: str = "oi",
+    participants: list[str] = None,
+    columns: list[str] = None,
+    full: bool = False,
+):
+    """
+    TOOL: fno_participant_positioning
+    DESCRIPTION:
+        Time series of F&O positioning over a DATE RANGE: Client / DII / FII / Pro long & short in index and stock
+        futures and options (participant OI or volume), or FII derivatives statistics. Adds net (long − short,
+        buy − sell) columns and day-over-day changes of every metric. Days come from the local EOD archive
+        (each published day is fetched once).
+    PARAMETERS:
+        from_date: str – "DD-MM-YYYY"
+        to_date: str – "DD-MM-YYYY" (default today)
+        dataset: str – "oi" (participant-wise OI) | "volume" (participant-wise volume) | "fii_stats"
+        participants: list[str] – Filter rows, e.g. ["FII", "Pro"] (FII stats: e.g. ["INDEX FUTURES"])
+        columns: list[str] – Keep only metrics whose name contains one of these, e.g. ["future_index", "total"]
+        full: bool – Return every row even if the server payload budget is exceeded
+    RETURNS:
+        {"data": rows of trade_date, participant, metrics, *_net, *_chg (or summary), "days", "missing", "errors"}
+    CATEGORY:
+        EOD_Range
+    EXAMPLES:
+        fno_participant_positioning("01-09-2025", "30-09-2025", participants=["FII"], columns=["future_index"])
+        fno_participant_positioning("01-09-2025", dataset="fii_stats")
+    """
+    source = POSITIONING_DATASETS.get(dataset.lower())
+    if source is None:
+        return {"error": f"dataset must be one of {', '.join(POSITIONING_DATASETS)}"}
+    start, end = resolve_date_range(from_date=from_date, to_date=to_date)
+    days = trading_days(start, end)
+    results, errors, _ = run_parallel({d: (lambda d=d: positioning_day(source, d)) for d in days})
+    frames = {d: results[d] for d in days if results.get(d) is not None}
+    missing = [format_nse_date(d) for d in days if d not in frames and d not in errors]
+    errors = {format_nse_date(d): e for d, e in errors.items()}
+    if not frames:
+        return {"data": [], "days": 0, "missing": missing, "errors": errors}
+
+    panel = pd.concat(frames, names=["trade_date", "participant"]).sort_index()
+    if participants:
+        wanted = {p.strip().upper() for p in participants}
+        panel = panel[panel.index.get_level_values("participant").str.upper().isin(wanted)]
+    panel = add_net_positions(panel)
+    if columns:
+        panel = panel[[c for c in panel.columns if any(_snake(k) in c for k in columns)]]
+    changes = panel.groupby(level="participant").diff().add_suffix("_chg")
+    out = pd.concat([panel, changes], axis=1).reset_index()
+    out["trade_date"] = pd.to_datetime(out["trade_date"]).dt.strftime("%d-%m-%Y")
+
+    params = dict(from_date=from_date, to_date=to_date, dataset=dataset, participants=participants, columns=columns)
+    return {
+        "data": budgeted("fno_participant_positioning", out, params, full=full),
+        "days": len(frames),
+        "missing": missing,
+        "errors": errors,
+    }
+
+
+# ---------------------------------------------------------------------
+# Delivery / volume anomaly screener (rolling per-symbol baselines)
+# ---------------------------------------------------------------------
+
+DELIVERY_FIELDS = {
+    "symbol": ("SYMBOL", "Symbol"),
+    "series": ("SERIES", "Series"),
+    "close": ("CLOSE_PRICE", "Close Price", "ClosePrice", "CLOSE"),
+    "prev_close": ("PREV_CLOSE", "Prev Close", "PrevClose"),
+    "volume": ("TTL_TRD_QNTY", "Total Traded Quantity", "TotalTradedQuantity", "Volume"),
+    "delivery_pct": ("DELIV_PER", "% Dly Qt to Traded Qty", "Deliverable %", "DeliveryPercent", "DELIVERY_PER"),
+}
+
+_delivery_days = BoundedMemo()   # (date, series) → (sorted symbols, float32 [close, prev_close, volume, delivery_pct])
+
+def delivery_arrays(day, series="EQ"):
+    """One archived delivery bhavcopy reduced to sorted symbols + a float32 value matrix (memoized per date)."""
+    key = (day, series)
+    cached = _delivery_days.get(key)
+    if cached is not None:
+        return cached
+    df = eod_frame("equity_eod_bhavcopy_delivery", format_nse_date(day))
+    if not isinstance(df, pd.DataFrame) or df.empty:
+        return None
+    df = df.rename(columns=lambda c: str(c).strip())
+    cols = {field: find_column(df, candidates) for field, candidates in DELIVERY_FIELDS.items()}
+    if cols["symbol"] is None or cols["volume"] is None:
+        raise ValueError(f"Unrecognized delivery bhavcopy layout for {format_nse_date(day)}")
+    if series and cols["series"] is not None:
+        df = df[df[cols["series"]].astype(str).str.strip().str.upper() == series.upper()]
+    symbols = df[cols["symbol"]].astype(str).str.strip().str.upper().to_numpy()
+    values = np.column_stack([
+        pd.to_numeric(df[cols[f]], errors="coerce").to_numpy(dtype=np.float32) if cols[f] is not None
+        else np.full(len(df), np.nan, dtype=np.float32)
+        for f in ("close", "prev_close", "volume", "delivery_pct")
+    ])
+    order = np.argsort(symbols, kind="stable")
+    return _delivery_days.put(key, (symbols[order], values[order]))
+
+def delivery_panel(day, lookback, series="EQ", deadline=None):
+    """
+    Target-day arrays plus (lookback × symbols) volume and delivery-% matrices of the preceding
+    trading days, aligned to the target day's symbols. Missing days / symbols are NaN.
+    """
+    days = [d for d in trading_days(day - dt.timedelta(days=lookback * 2 + 14), day) if d < day][-lookback:]
+    tasks = {d: (lambda d=d: delivery_arrays(d, series)) for d in [day] + days}
+    results, errors, timed_out = run_parallel(tasks, deadline=deadline)
+    target = results.get(day)
+    if target is None:
+        raise ValueError(errors.get(day, f"No delivery bhavcopy for {format_nse_date(day)}"))
+    symbols, today = target
+    volume = np.full((len(days), len(symbols)), np.nan, dtype=np.float32)
+    delivery = np.full_like(volume, np.nan)
+    for row, d in enumerate(days):
+        past = results.get(d)
+        if past is None:
+            continue
+        pos = np.searchsorted(past[0], symbols).clip(max=max(len(past[0]) - 1, 0))
+        hit = past[0][pos] == symbols if len(past[0]) else np.zeros(len(symbols), dtype=bool)
+        volume[row, hit] = past[1][pos[hit], 2]
+        delivery[row, hit] = past[1][pos[hit], 3]
+    return symbols, today, volume, delivery, [format_nse_date(d) for d in days if results.get(d) is None]
+
+def _zscore(value, history):
+    # Symbols with no (or a single) baseline observation yield NaN; numpy reports those as
+    # RuntimeWarnings ("Mean of empty slice", "Degrees of freedom <= 0"), which errstate does not cover.
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean, std = np.nanmean(history, axis=0), np.nanstd(history, axis=0, ddof=1)
+        return mean, (value - mean) / np.where(std > 0, std, np.nan)
+
+@mcp.tool()
+def equity_delivery_anomalies(
+    date: str = None,
+    lookback_days: int = 20,
+    z_threshold: float = 3.0,
+    min_avg_volume: float = 10000,
+    series: str = "EQ",
+    top_n: int = 50,
+    deadline_seconds: float = 120.0,
+):
+    """
+    TOOL: equity_delivery_anomalies
+    DESCRIPTION:
+        Screens EVERY listed stock for unusual volume and delivery % on one day versus its own rolling
+        baseline (mean, std, 90th percentile over the previous N trading days) and returns the z-score outliers.
+        Baselines come from the local EOD archive of delivery bhavcopies (fetched once, then reused).
+    PARAMETERS:
+        date: str – "DD-MM-YYYY" (default: latest trading day with a published bhavcopy)
+        lookback_days: int – Trading days in the baseline window
+        z_threshold: float – Minimum |z| of volume or delivery % to be flagged
+        min_avg_volume: float – Ignore stocks whose baseline average volume is below this
+        series: str – Bhavcopy series filter ("EQ"; "" for all)
+        top_n: int – Maximum rows returned (highest z first)
+        deadline_seconds: float – Upstream fetch deadline for baseline days
+    RETURNS:
+        {"date", "baseline_days", "screened", "anomalies": [{symbol, close, pct_change, volume, avg_volume,
+          volume_ratio, volume_z, delivery_pct, avg_delivery_pct, delivery_p90, delivery_z, flags}], "missing_days"}
+    CATEGORY:
+        Equity_EOD
+    EXAMPLES:
+        equity_delivery_anomalies()
+        equity_delivery_anomalies("17-10-2025", lookback_days=60, z_threshold=2.5)
+    """
+    if date:
+        day = parse_nse_date(date)
+    else:
+        def available(d):
+            # a failed download for one date falls back to the previous trading day
+            try:
+                return delivery_arrays(d, series) is not None
+            except Exception:
+                return False
+
+        try:
+            recent = trading_days(dt.date.today() - dt.timedelta(days=10), dt.date.today())
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+        day = next((d for d in reversed(recent) if available(d)), None)
+        if day is None:
+            return {"error": "No recent delivery bhavcopy available"}
+    try:
+        symbols, today, volume, delivery, missing = delivery_panel(day, lookback_days, series, deadline_seconds)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+    close, prev_close, vol_now, deliv_now = today.T
+    avg_volume, volume_z = _zscore(vol_now, volume)
+    avg_delivery, delivery_z = _zscore(deliv_now, delivery)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)   # "All-NaN slice" for symbols without history
+        delivery_p90 = np.nanpercentile(delivery, 90, axis=0) if len(delivery) else np.full(len(symbols), np.nan)
+    observed = np.isfinite(volume).sum(axis=0) >= max(2, lookback_days // 2)
+
+    vol_flag = np.nan_to_num(np.abs(volume_z)) >= z_threshold
+    deliv_flag = np.nan_to_num(np.abs(delivery_z)) >= z_threshold
+    keep = observed & (np.nan_to_num(avg_volume) >= min_avg_volume) & (vol_flag | deliv_flag)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = pd.DataFrame({
+            "symbol": symbols, "close": close, "pct_change": 100 * (close / prev_close - 1),
+            "volume": vol_now, "avg_volume": avg_volume, "volume_ratio": vol_now / avg_volume, "volume_z": volume_z,
+            "delivery_pct": deliv_now, "avg_delivery_pct": avg_delivery, "delivery_p90": delivery_p90,
+            "delivery_z": delivery_z,
+        })[keep]
+    out["flags"] = [
+        ",".join(f for f, on in (("volume", v), ("delivery", d)) if on)
+        for v, d in zip(vol_flag[keep], deliv_flag[keep])
+    ]
+    out["_rank"] = np.fmax(np.abs(out["volume_z"]), np.abs(out["delivery_z"]))
+    out = out.nlargest(top_n, "_rank").drop(columns="_rank").round(2)
+    return {
+        "date": format_nse_date(day),
+        "baseline_days": int(len(volume) - len(missing)),
+        "screened": int(observed.sum()),
+        "anomalies": json_safe(out.reset_index(drop=True)),
+        "missing_days": missing,
+    }
+
+
+
+# ---------------------------------------------------------------------
+# EOD warehouse (DuckDB views over the Parquet archive) + SQL tool
+# ---------------------------------------------------------------------
+
+WAREHOUSE_DATASETS = [d.strip() for d in os.environ.get("MCP_WAREHOUSE_DATASETS", "").split(",") if d.strip()]
+WAREHOUSE_BACKFILL_DAYS = int(os.environ.get("MCP_WAREHOUSE_BACKFILL_DAYS", "5"))
+WAREHOUSE_FILL_INTERVAL = float(os.environ.get("MCP_WAREHOUSE_FILL_INTERVAL", "3600"))
+QUERY_MAX_ROWS = int(os.environ.get("MCP_QUERY_MAX_ROWS", "5000"))
+QUERY_TIMEOUT = float(os.environ.get("MCP_QUERY_TIMEOUT", "30"))
+QUERY_PREFIXES = ("select", "with", "describe", "show", "summarize")
+# Table functions that run a SQL string; refused so a query cannot be assembled at run time.
+QUERY_DYNAMIC_SQL = re.compile(r"\bquery(?:_table)?\s*\(", re.IGNORECASE)
+
+_warehouse = {"con": None, "views": frozenset()}
+_warehouse_lock = Lock()
+
+def locked_down_connection(duckdb, archive):
+    """
+    In-memory DuckDB that can read files only below the archive directory: no other local paths,
+    no URLs, no extension install/autoload, and the configuration is locked so queries cannot undo it.
+    """
+    con = duckdb.connect(":memory:")
+    con.execute("SET autoinstall_known_extensions = false")
+    con.execute("SET autoload_known_extensions = false")
+    con.execute(f"SET allowed_directories = ['{archive.replace(chr(39), chr(39) * 2)}']")
+    con.execute("SET enable_external_access = false")
+    con.execute("SET lock_configuration = true")
+    return con
+
+def warehouse_connection():
+    """
+    In-memory DuckDB connection with one view per archived EOD dataset (plus a trade_date column
+    from the file name). Views re-expand their glob on every query, so newly archived days appear
+    automatically; views are recreated only when a new dataset directory shows up.
+    """
+    try:
+        import duckdb
+    except ImportError:
+        raise RuntimeError("query_eod needs DuckDB: pip install 'nsekit-mcp[warehouse]'")
+    if not archive_enabled():
+        raise RuntimeError("Set MCP_EOD_ARCHIVE_DIR (and install pyarrow) to build the EOD warehouse")
+
+    datasets = frozenset(
+        d for d in (os.listdir(EOD_ARCHIVE_DIR) if os.path.isdir(EOD_ARCHIVE_DIR) else [])
+        if d in EOD_SOURCES and any(f.endswith(".parquet") for f in os.listdir(os.path.join(EOD_ARCHIVE_DIR, d)))
+    )
+    archive = os.path.abspath(EOD_ARCHIVE_DIR)
+    with _warehouse_lock:
+        if _warehouse["con"] is None:
+            _warehouse["con"] = locked_down_connection(duckdb, archive)
+        con = _warehouse["con"]
+        for dataset in datasets - _warehouse["views"]:
+            pattern = os.path.join(archive, dataset, "*.parquet").replace("'", "''")
+            con.execute(
+                f"CREATE OR REPLACE VIEW {dataset} AS "
+                f"SELECT CAST(regexp_extract(filename, '(\\d{{4}}-\\d{{2}}-\\d{{2}})\\.parquet$', 1) AS DATE) AS trade_date, "
+                f"* EXCLUDE (filename) FROM read_parquet('{pattern}', filename = true, union_by_name = true)"
+            )
+        _warehouse["views"] = datasets
+    return con, sorted(datasets)
+
+def fill_warehouse(datasets=None, days=None):
+    """Archives the last `days` trading days of each dataset that are not on disk yet (scheduled job)."""
+    end = dt.date.today() - dt.timedelta(days=1)
+    start = end - dt.timedelta(days=(days or WAREHOUSE_BACKFILL_DAYS) * 2 + 7)
+    recent = trading_days(start, end)[-(days or WAREHOUSE_BACKFILL_DAYS):]
+    tasks = {
+        f"{dataset} {format_nse_date(day)}": (lambda ds=dataset, d=day: eod_frame(ds, format_nse_date(d)))
+        for dataset in (datasets or WAREHOUSE_DATASETS) if dataset in EOD_SOURCES
+        for day in recent if not os.path.exists(archive_path(dataset, day))
+    }
+    _, errors, _ = run_parallel(tasks)
+    return {"filled": len(tasks) - len(errors), "errors": errors}
+
+@mcp.tool()
+def query_eod(sql: str, max_rows: int = 1000, timeout_seconds: float = None):
+    """
+    TOOL: query_eod
+    DESCRIPTION:
+        Read-only SQL (DuckDB dialect) over the local EOD archive: one table per archived dataset, each
+        with a trade_date column, e.g. equity_eod_bhavcopy_delivery, fno_bhavcopy, fno_participant_wise_oi,
+        equity_pe_ratio, market_cap. One scan over months of data instead of hundreds of tool calls.
+        Days enter the archive whenever an EOD tool / eod_data_range fetches them, or via the scheduled
+        fill (MCP_WAREHOUSE_DATASETS). Use "SHOW TABLES" / "DESCRIBE <table>" to explore.
+    PARAMETERS:
+        sql: str – A single SELECT / WITH / DESCRIBE / SHOW / SUMMARIZE statement
+        max_rows: int – Rows returned (capped by MCP_QUERY_MAX_ROWS)
+        timeout_seconds: float – Query is interrupted after this long (default MCP_QUERY_TIMEOUT)
+    RETURNS:
+        {"columns": [...], "rows": [...], "row_count": n, "truncated": bool, "tables": [...]}
+    CATEGORY:
+        EOD_Range
+    EXAMPLES:
+        query_eod("SELECT trade_date, SYMBOL, DELIV_PER FROM equity_eod_bhavcopy_delivery WHERE SYMBOL = 'TCS' ORDER BY trade_date")
+        query_eod("SHOW TABLES")
+    """
+    statement = sql.strip().rstrip(";").strip()
+    if not statement.lower().startswith(QUERY_PREFIXES):
+        return {"error": f"Only {', '.join(p.upper() for p in QUERY_PREFIXES)} statements are allowed"}
+    if QUERY_DYNAMIC_SQL.search(re.sub(r"'(?:[^']|'')*'", "''", statement)):
+        return {"error": "query() / query_table() are not allowed"}
+    try:
+        con, tables = warehouse_connection()
+    except RuntimeError as e:
+        return {"error": str(e)}
+    # The connection itself enforces read-only file access; this only keeps the tool to one query.
+    try:
+        parsed = con.extract_statements(statement)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}", "tables": tables}
+    if len(parsed) != 1 or parsed[0].type.name != "SELECT":
+        return {"error": "Exactly one read-only query is allowed", "tables": tables}
+
+    limit = max(1, min(max_rows, QUERY_MAX_ROWS))
+    timeout = timeout_seconds or QUERY_TIMEOUT
+    cursor = con.cursor()
+    timer = Timer(timeout, cursor.interrupt)
+    timer.start()
+    try:
+        if statement.lower().startswith(("select", "with")):
+            df = cursor.execute(f"SELECT * FROM (\n{statement}\n) AS q LIMIT {limit + 1}").df()
+        else:
+            df = cursor.execute(statement).df()
+    except Exception as e:
+        message = f"{type(e).__name__}: {e}"
+        if "interrupt" in message.lower():
+            message = f"Query exceeded {timeout:g}s and was cancelled"
+        return {"error": message, "tables": tables}
+    finally:
+        timer.cancel()
+        cursor.close()
+
+    truncated = len(df) > limit
+    df = df.head(limit)
+    return {
+        "columns": [str(c) for c in df.columns],
+        "rows": json_safe(df),
+        "row_count": len(df),
+        "truncated": truncated,
+        "tables": tables,
+    }
 
 
 @mcp.tool()
@@ -2013,6 +4161,442 @@ def options_price_history(symbol: str, type_: str, strike: str = None, from_date
     return df_to_json(get.option_price_volume_data(symbol, type_, strike, from_date, to_date, expiry=expiry or period))
 
 
+HISTORY_CHUNK_DAYS = int(os.environ.get("MCP_HISTORY_CHUNK_DAYS", "365"))
+
+# kind → fetch(symbol, from_date, to_date, **extra) for one upstream-sized chunk
+HISTORY_FETCHERS = {
+    "equity": lambda symbol, from_date, to_date, **_:
+        get.cm_hist_security_wise_data(symbol=symbol, from_date=from_date, to_date=to_date),
+    "index": lambda symbol, from_date, to_date, **_:
+        get.index_historical_data(index=symbol, from_date=from_date, to_date=to_date),
+    "futures": lambda symbol, from_date, to_date, instrument_type=None, expiry=None, **_:
+        get.future_price_volume_data(symbol, instrument_type, expiry, from_date, to_date),
+    "options": lambda symbol, from_date, to_date, instrument_type=None, expiry=None, strike=None, **_:
+        get.option_price_volume_data(symbol, instrument_type, strike, from_date, to_date, expiry=expiry),
+}
+
+def history_chunks(start, end, chunk_days=None):
+    """
+    Splits [start, end] into windows on a fixed grid of `chunk_days`, so overlapping
+    requests map to the same chunk cache keys. Yields (chunk_start, chunk_end).
+    """
+    chunk_days = chunk_days or HISTORY_CHUNK_DAYS
+    epoch = dt.date(2000, 1, 1)
+    start = max(start, epoch)   # the chunk grid (and NSE's online history) starts at the epoch
+    offset = (start - epoch).days // chunk_days
+    chunk_start = epoch + dt.timedelta(days=offset * chunk_days)
+    while chunk_start <= end:
+        chunk_end = chunk_start + dt.timedelta(days=chunk_days - 1)
+        yield chunk_start, min(chunk_end, dt.date.today())
+        chunk_start = chunk_end + dt.timedelta(days=1)
+
+def history_chunk(kind, symbol, chunk_start, chunk_end, **extra):
+    """One cached chunk; windows that ended before today are immutable and kept for EOD_CACHE_TTL."""
+    ttl = EOD_CACHE_TTL if chunk_end < dt.date.today() else HISTORY_CACHE_TTL
+    fetch = HISTORY_FETCHERS[kind]
+    return cached_frame(
+        f"{kind}_history_chunk", fetch, ttl=ttl,
+        symbol=symbol, from_date=format_nse_date(chunk_start), to_date=format_nse_date(chunk_end),
+        **{k: v for k, v in extra.items() if v is not None},
+    )
+
+# Columns that, with symbol and date, identify one derivatives contract per row
+CONTRACT_KEY_COLUMNS = (
+    ("FH_EXPIRY_DT", "EXPIRY_DT", "expiryDate", "Expiry", "expiry"),
+    ("FH_STRIKE_PRICE", "STRIKE_PR", "strikePrice", "Strike Price", "strike"),
+    ("FH_OPTION_TYPE", "OPTION_TYP", "optionType", "Option Type"),
+    ("FH_INSTRUMENT", "INSTRUMENT", "instrumentType", "Instrument"),
+)
+
+def merge_history(frames, start=None, end=None, kind="equity"):
+    """
+    Concatenates per-symbol chunks, de-duplicates, trims to [start, end] and sorts.
+    Equity/index history has one row per (symbol, date); futures/options history has one row per
+    contract, so those are de-duplicated on the contract key columns present (else the full row).
+    """
+    frames = [f for f in frames if isinstance(f, pd.DataFrame) and not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True)
+    col = date_column(df)
+    if col is None:
+        return df.drop_duplicates(ignore_index=True)
+    dates = parse_dates(df[col])
+    keep = pd.Series(True, index=df.index)
+    if start is not None:
+        keep &= dates >= pd.Timestamp(start)
+    if end is not None:
+        keep &= dates <= pd.Timestamp(end)
+    df = df.assign(_date=dates)[keep]
+    if kind in ("equity", "index"):
+        df = df.drop_duplicates(subset=["symbol", "_date"])
+    else:
+        contract = [c for c in (find_column(df, names) for names in CONTRACT_KEY_COLUMNS) if c is not None]
+        df = df.drop_duplicates(subset=["symbol", "_date", *contract] if contract else None)
+    df = df.sort_values(["symbol", "_date"], kind="stable")
+    return df.drop(columns="_date").reset_index(drop=True)
+
+def bulk_history(symbols, kind="equity", period=None, from_date=None, to_date=None, deadline=None, **extra):
+    """
+    Fetches every (symbol, chunk) pair in parallel and merges them into one frame.
+    Returns (frame, errors by "SYMBOL from..to", unfinished chunk keys).
+    """
+    if kind not in HISTORY_FETCHERS:
+        raise ValueError(f"kind must be one of {', '.join(HISTORY_FETCHERS)}")
+    start, end = resolve_date_range(period, from_date, to_date)
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+
+    tasks = {}
+    for symbol in symbols:
+        for chunk_start, chunk_end in history_chunks(start, end):
+            key = f"{symbol} {format_nse_date(chunk_start)}..{format_nse_date(chunk_end)}"
+            tasks[key] = (lambda s=symbol, a=chunk_start, b=chunk_end:
+                          (s, history_chunk(kind, s, a, b, **extra)))
+    results, errors, timed_out = run_parallel(tasks, deadline=deadline)
+
+    frames = []
+    for symbol, frame in results.values():
+        if isinstance(frame, pd.DataFrame) and not frame.empty:
+            frames.append(frame if "symbol" in frame.columns else frame.assign(symbol=symbol))
+    return merge_history(frames, start, end, kind), errors, timed_out
+
+@mcp.tool()
+def price_history_bulk(
+    symbols: list[str],
+    kind: str = "equity",
+    period: str = None,
+    from_date: str = None,
+    to_date: str = None,
+    instrument_type: str = None,
+    expiry: str = None,
+    strike: str = None,
+    deadline_seconds: float = 120.0,
+    full: bool = False,
+):
+    """
+    TOOL: price_history_bulk
+    DESCRIPTION:
+        Daily history for MANY symbols over LONG ranges in one call (e.g. all Nifty 50 stocks for 5 years).
+        Ranges are split into upstream-sized chunks fetched in parallel within the NSE rate limit;
+        chunks already fetched are reused. Output is one merged, de-duplicated table with a "symbol" column.
+    PARAMETERS:
+        symbols: list[str] – Stock symbols (kind="equity"), index names (kind="index") or F&O underlyings
+        kind: str – "equity" | "index" | "futures" | "options"
+        period: str – "1M","3M","6M","1Y","2Y","5Y","10Y","YTD" (used when from_date is not given)
+        from_date/to_date: str – "DD-MM-YYYY"
+        instrument_type: str – futures/options only: "Index Futures", "Stock Futures", "Index Options", "Stock Options"
+        expiry: str – futures/options only, e.g. "28-10-2025"
+        strike: str – options only, e.g. "25000"
+        deadline_seconds: float – Return what is ready after this long; call again to resume from cache
+        full: bool – Return every row even if the server payload budget is exceeded
+    RETURNS:
+        {"data": rows (or summary), "errors": {...}, "timed_out": [chunks not yet fetched]}
+    CATEGORY:
+        Historical
+    EXAMPLES:
+        price_history_bulk(["TCS", "INFY", "WIPRO"], period="5Y")
+        price_history_bulk(["NIFTY 50", "NIFTY BANK"], kind="index", from_date="01-01-2020")
+    """
+    df, errors, timed_out = bulk_history(
+        symbols, kind=kind.lower(), period=period, from_date=from_date, to_date=to_date,
+        deadline=deadline_seconds, instrument_type=instrument_type, expiry=expiry, strike=strike,
+    )
+    params = dict(symbols=symbols, kind=kind, period=period, from_date=from_date, to_date=to_date,
+                  instrument_type=instrument_type, expiry=expiry, strike=strike)
+    return {
+        "data": budgeted("price_history_bulk", df, params, full=full),
+        "errors": errors,
+        "timed_out": timed_out,
+    }
+
+
+
+# ---------------------------------------------------------------------
+# Technical indicators (computed over the cached history chunks)
+# ---------------------------------------------------------------------
+
+OHLCV_COLUMNS = {
+    "open": ("CH_OPENING_PRICE", "OPEN_INDEX_VAL", "Open Price", "Open", "FH_OPENING_PRICE"),
+    "high": ("CH_TRADE_HIGH_PRICE", "HIGH_INDEX_VAL", "High Price", "High", "FH_TRADE_HIGH_PRICE"),
+    "low": ("CH_TRADE_LOW_PRICE", "LOW_INDEX_VAL", "Low Price", "Low", "FH_TRADE_LOW_PRICE"),
+    "close": ("CH_CLOSING_PRICE", "CLOSE_INDEX_VAL", "Close Price", "Close", "FH_CLOSING_PRICE",
+              "CH_LAST_TRADED_PRICE", "Last Price", "LTP"),
+    "volume": ("CH_TOT_TRADED_QTY", "TotalTradedQuantity", "Total Traded Quantity", "Volume",
+               "FH_TOT_TRADED_QTY", "HIT_TRADED_QTY", "Shares Traded"),
+}
+INDICATORS = ("sma", "ema", "rsi", "atr", "bollinger", "vwap", "supertrend", "pivots")
+
+_indicator_memo = BoundedMemo()   # (symbol, kind, options, last bar date + values, rows) → result
+
+def ohlcv_frame(df):
+    """History in any NseKit layout → date-indexed float frame with open/high/low/close/volume."""
+    col = date_column(df)
+    if col is None:
+        raise ValueError("History has no date column")
+    out = pd.DataFrame(index=pd.DatetimeIndex(parse_dates(df[col]), name="date"))
+    for field, candidates in OHLCV_COLUMNS.items():
+        src = find_column(df, candidates)
+        out[field] = pd.to_numeric(df[src], errors="coerce").to_numpy() if src else np.nan
+    if out["close"].isna().all():
+        raise ValueError("History has no close price column")
+    out = out[out.index.notna()]
+    return out[~out.index.duplicated(keep="last")].sort_index()
+
+def wilder(series, n):
+    return series.ewm(alpha=1.0 / n, adjust=False, min_periods=n).mean()
+
+def true_range(bars):
+    prev_close = bars["close"].shift()
+    return pd.concat([bars["high"] - bars["low"], (bars["high"] - prev_close).abs(), (bars["low"] - prev_close).abs()], axis=1).max(axis=1)
+
+def supertrend(bars, n=10, multiplier=3.0):
+    """
+    Supertrend line and direction (+1 up / −1 down). Bands are vectorized; the trailing-band
+    ratchet depends on the previous value, so it is one NumPy pass over the arrays.
+    """
+    mid = ((bars["high"] + bars["low"]) / 2).to_numpy()
+    atr = wilder(true_range(bars), n).to_numpy()
+    close = bars["close"].to_numpy()
+    upper, lower = mid + multiplier * atr, mid - multiplier * atr
+    line, direction = np.full(len(close), np.nan), np.zeros(len(close))
+    for i in range(1, len(close)):
+        if np.isnan(atr[i - 1]):
+            direction[i] = 1
+            continue
+        if not (upper[i] < upper[i - 1] or close[i - 1] > upper[i - 1]):
+            upper[i] = upper[i - 1]
+        if not (lower[i] > lower[i - 1] or close[i - 1] < lower[i - 1]):
+            lower[i] = lower[i - 1]
+        direction[i] = 1 if close[i] > upper[i - 1] else -1 if close[i] < lower[i - 1] else direction[i - 1] or 1
+        line[i] = lower[i] if direction[i] > 0 else upper[i]
+    return pd.Series(line, index=bars.index), pd.Series(direction, index=bars.index)
+
+def floor_pivots(high, low, close):
+    """Classic floor-trader pivots from one completed bar."""
+    p = (high + low + close) / 3
+    return {"pivot": p, "r1": 2 * p - low, "s1": 2 * p - high, "r2": p + (high - low), "s2": p - (high - low),
+            "r3": high + 2 * (p - low), "s3": low - 2 * (high - p)}
+
+def compute_indicators(bars, indicators=INDICATORS, ma_periods=(20, 50, 200), rsi_period=14, atr_period=14,
+                       bb_period=20, bb_std=2.0, vwap_period=20, st_period=10, st_multiplier=3.0):
+    """Indicator columns next to close for every bar (pivots are returned separately)."""
+    close = bars["close"]
+    out = pd.DataFrame({"close": close})
+    if "sma" in indicators:
+        for n in ma_periods:
+            out[f"sma_{n}"] = close.rolling(n).mean()
+    if "ema" in indicators:
+        for n in ma_periods:
+            out[f"ema_{n}"] = close.ewm(span=n, adjust=False, min_periods=n).mean()
+    if "rsi" in indicators:
+        change = close.diff()
+        gain, loss = wilder(change.clip(lower=0), rsi_period), wilder(-change.clip(upper=0), rsi_period)
+        rsi = 100 - 100 / (1 + gain / loss.replace(0, np.nan))
+        # no losses in the window: 100 if price rose, neutral 50 if it did not move at all
+        out[f"rsi_{rsi_period}"] = rsi.mask(loss.eq(0) & gain.gt(0), 100.0).mask(loss.eq(0) & gain.eq(0), 50.0)
+    if "atr" in indicators:
+        out[f"atr_{atr_period}"] = wilder(true_range(bars), atr_period)
+    if "bollinger" in indicators:
+        mid, sd = close.rolling(bb_period).mean(), close.rolling(bb_period).std(ddof=0)
+        out["bb_mid"], out["bb_upper"], out["bb_lower"] = mid, mid + bb_std * sd, mid - bb_std * sd
+        out["bb_pct_b"] = (close - out["bb_lower"]) / (out["bb_upper"] - out["bb_lower"])
+    if "vwap" in indicators and bars["volume"].notna().any():
+        typical = (bars["high"] + bars["low"] + close) / 3
+        out[f"vwap_{vwap_period}"] = ((typical * bars["volume"]).rolling(vwap_period).sum()
+                                      / bars["volume"].rolling(vwap_period).sum())
+    if "supertrend" in indicators:
+        out["supertrend"], out["supertrend_dir"] = supertrend(bars, st_period, st_multiplier)
+    return out
+
+@mcp.tool()
+def technical_indicators(
+    symbol: str,
+    kind: str = "equity",
+    indicators: list[str] = None,
+    period: str = "1Y",
+    ma_periods: list[int] = None,
+    series_points: int = 0,
+    deadline_seconds: float = 60.0,
+):
+    """
+    TOOL: technical_indicators
+    DESCRIPTION:
+        Server-computed indicators on daily history: SMA/EMA, RSI(14), ATR(14), Bollinger(20,2),
+        rolling VWAP(20), Supertrend(10,3) and floor pivots for the next session.
+        Returns the latest values (and optionally a compact tail of the series) instead of raw OHLC.
+        History comes from the shared chunk cache, so repeat calls cost no upstream requests.
+    PARAMETERS:
+        symbol: str – Stock symbol (kind="equity") or index name (kind="index")
+        kind: str – "equity" | "index"
+        indicators: list[str] – Subset of sma, ema, rsi, atr, bollinger, vwap, supertrend, pivots (default all)
+        period: str – History window incl. warm-up, e.g. "1Y", "2Y"
+        ma_periods: list[int] – SMA/EMA lengths (default [20, 50, 200])
+        series_points: int – Also return the last N rows of every indicator (0 = latest only)
+        deadline_seconds: float – Upstream fetch deadline
+    RETURNS:
+        {"symbol", "as_of", "latest": {close, sma_20, ..., rsi_14, atr_14, bb_*, vwap_20, supertrend, supertrend_dir},
+         "pivots": {pivot, r1..r3, s1..s3}, "series": [...] (when series_points > 0)}
+    CATEGORY:
+        Historical
+    EXAMPLES:
+        technical_indicators("RELIANCE")
+        technical_indicators("NIFTY 50", kind="index", indicators=["ema", "rsi", "supertrend"], series_points=20)
+    """
+    kind = kind.lower()
+    if kind not in ("equity", "index"):
+        return {"error": "kind must be 'equity' or 'index'"}
+    requested = {x.strip().lower() for x in indicators} if indicators is not None else set(INDICATORS)
+    unknown = requested - set(INDICATORS)
+    if unknown:
+        return {"error": f"Unknown indicators: {', '.join(sorted(unknown))}. Valid: {', '.join(INDICATORS)}"}
+    chosen = tuple(i for i in INDICATORS if i in requested)
+    ma_periods = tuple(ma_periods or (20, 50, 200))
+    history, errors, timed_out = bulk_history([symbol], kind=kind, period=period, deadline=deadline_seconds)
+    if history.empty:
+        return {"error": f"No history for {symbol}", "errors": errors, "timed_out": timed_out}
+    bars = ohlcv_frame(history)
+
+    # today's bar keeps its date and the row count while it updates intraday, so its values are part of the key
+    last_bar = bars.iloc[-1].to_numpy(dtype=float).tobytes()
+    key = (symbol.upper(), kind, chosen, ma_periods, bars.index[-1], last_bar, len(bars))
+    table = _indicator_memo.get(key)
+    if table is None:
+        table = _indicator_memo.put(key, compute_indicators(bars, chosen, ma_periods).round(4))
+
+    result = {
+        "symbol": symbol.upper(),
+        "as_of": bars.index[-1].strftime("%d-%m-%Y"),
+        "latest": {k: (None if pd.isna(v) else float(v)) for k, v in table.iloc[-1].items()},
+    }
+    if "pivots" in chosen:
+        last = bars.iloc[-1]
+        result["pivots"] = {k: round(float(v), 2) for k, v in floor_pivots(last["high"], last["low"], last["close"]).items()}
+    if series_points > 0:
+        result["series"] = json_safe(table.tail(series_points).reset_index().assign(
+            date=lambda f: f["date"].dt.strftime("%d-%m-%Y")))
+    if errors or timed_out:
+        result.update(errors=errors, timed_out=timed_out)
+    return result
+
+
+
+# ---------------------------------------------------------------------
+# Returns panel / correlation / beta (from the bulk history chunks)
+# ---------------------------------------------------------------------
+
+TRADING_DAYS_PER_YEAR = 252
+_risk_matrix_memo = BoundedMemo()   # (symbols, benchmark, period, returns, as-of date) → result
+
+def close_panel(history):
+    """Merged bulk history → date × symbol frame of closing prices."""
+    if history.empty:
+        return pd.DataFrame()
+    close_col, date_col = find_column(history, OHLCV_COLUMNS["close"]), date_column(history)
+    if close_col is None or date_col is None:
+        raise ValueError("History has no date / close columns")
+    frame = pd.DataFrame({
+        "date": parse_dates(history[date_col]),
+        "symbol": history["symbol"].astype(str).str.upper(),
+        "close": pd.to_numeric(history[close_col], errors="coerce"),
+    }).dropna()
+    return frame.pivot_table(index="date", columns="symbol", values="close", aggfunc="last").sort_index()
+
+def returns_panel(prices, method="log", min_coverage=0.8):
+    """Daily returns aligned on common dates; symbols with < min_coverage of observations are dropped."""
+    returns = np.log(prices).diff() if method == "log" else prices.pct_change(fill_method=None)
+    returns = returns.iloc[1:]
+    returns = returns.loc[:, returns.notna().mean() >= min_coverage]
+    return returns.dropna()
+
+@mcp.tool()
+def returns_correlation(
+    symbols: list[str] = None,
+    index_universe: str = None,
+    benchmark: str = "NIFTY 50",
+    period: str = "1Y",
+    method: str = "log",
+    include_covariance: bool = False,
+    deadline_seconds: float = 180.0,
+):
+    """
+    TOOL: returns_correlation
+    DESCRIPTION:
+        Aligned daily returns panel for a list of stocks (or every constituent of an index) and its
+        correlation matrix, annualized volatility and beta against a benchmark index, computed with NumPy.
+        History comes from the shared bulk-history chunk cache; results are cached per universe, window and day.
+    PARAMETERS:
+        symbols: list[str] – Stocks, e.g. ["TCS", "INFY", "HDFCBANK"]
+        index_universe: str – Alternatively all constituents of an index, e.g. "NIFTY 50"
+        benchmark: str – Index used for beta, e.g. "NIFTY 50", "NIFTY BANK"
+        period: str – "3M", "6M", "1Y", "2Y", ...
+        method: str – "log" | "simple" returns
+        include_covariance: bool – Also return the annualized covariance matrix
+        deadline_seconds: float – Upstream fetch deadline (call again to resume from cache)
+    RETURNS:
+        {"symbols", "benchmark", "from", "to", "observations", "beta": {...}, "annualized_vol": {...},
+         "correlation": {"columns": [...], "matrix": [[...]]}, "covariance" (optional), "dropped", "errors"}
+    CATEGORY:
+        Historical
+    EXAMPLES:
+        returns_correlation(index_universe="NIFTY 50", period="1Y")
+        returns_correlation(["TCS", "INFY", "WIPRO", "HCLTECH"], benchmark="NIFTY IT", period="6M")
+    """
+    if method not in ("log", "simple"):
+        return {"error": "method must be 'log' or 'simple'"}
+    universe = list(symbols or [])
+    if index_universe:
+        long, errors, _ = constituents_long([index_universe])
+        if long.empty or "symbol" not in long.columns:
+            return {"error": f"No constituents for {index_universe}", "errors": errors}
+        universe += long["symbol"].astype(str).tolist()
+    universe = sorted(dict.fromkeys(s.strip().upper() for s in universe if s and s.strip()))
+    if len(universe) < 2:
+        return {"error": "Need at least two symbols"}
+    benchmark = benchmark.strip().upper()
+
+    key = (tuple(universe), benchmark, period, method, dt.date.today())
+    cached = _risk_matrix_memo.get(key)
+    if cached is not None:
+        result = cached
+    else:
+        stocks, errors, timed_out = bulk_history(universe, kind="equity", period=period, deadline=deadline_seconds)
+        index, index_errors, index_timed_out = bulk_history([benchmark], kind="index", period=period, deadline=deadline_seconds)
+        errors.update(index_errors)
+        timed_out += index_timed_out
+        prices = close_panel(stocks).join(close_panel(index).rename(columns=lambda c: "__benchmark__"), how="inner")
+        if "__benchmark__" not in prices.columns:
+            return {"error": f"No history for benchmark {benchmark}", "errors": errors, "timed_out": timed_out}
+
+        returns = returns_panel(prices, method)
+        columns = [c for c in returns.columns if c != "__benchmark__"]
+        if len(returns) < 20 or len(columns) < 2:
+            return {"error": "Not enough overlapping history", "errors": errors, "timed_out": timed_out}
+        matrix = returns[columns + ["__benchmark__"]].to_numpy(dtype=float)
+        cov = np.cov(matrix, rowvar=False) * TRADING_DAYS_PER_YEAR
+        vol = np.sqrt(np.diag(cov))
+        corr = cov / np.outer(vol, vol)
+        n = len(columns)
+        result = {
+            "symbols": columns,
+            "benchmark": benchmark,
+            "from": returns.index[0].strftime("%d-%m-%Y"),
+            "to": returns.index[-1].strftime("%d-%m-%Y"),
+            "observations": len(returns),
+            "beta": dict(zip(columns, np.round(cov[:n, n] / cov[n, n], 3).tolist())),
+            "benchmark_correlation": dict(zip(columns, np.round(corr[:n, n], 3).tolist())),
+            "annualized_vol": dict(zip(columns + [benchmark], np.round(vol, 4).tolist())),
+            "correlation": {"columns": columns, "matrix": np.round(corr[:n, :n], 3).tolist()},
+            "covariance": {"columns": columns, "matrix": np.round(cov[:n, :n], 6).tolist()},
+            "dropped": sorted(set(universe) - set(columns)),
+            "errors": errors,
+        }
+        if not timed_out:
+            _risk_matrix_memo.put(key, result)
+        else:
+            result = {**result, "timed_out": timed_out}
+    return result if include_covariance else {k: v for k, v in result.items() if k != "covariance"}
+
+
 @mcp.tool()
 def fno_lot_sizes(symbol: str = None):
     """
@@ -2111,8 +4695,69 @@ def sebi_data_pages(page: int = 1):
     return df_to_json(get.sebi_data(page))
 
 
+# ---------------------------------------------------------------------
+# Chart downsampling (LTTB / OHLC bars) shared by the chart tools
+# ---------------------------------------------------------------------
+
+CHART_TIME_COLUMNS = ("datetime_utc", "timestamp", "datetime", "time", "snapshot_time", "date")
+CHART_PRICE_COLUMNS = ("price", "lastPrice", "close", "value", "ltp")
+CHART_VOLUME_COLUMNS = ("volume", "totalTradedVolume", "qty")
+CHART_BAR_RULES = {"1m": "1min", "5m": "5min", "15m": "15min", "30m": "30min", "1h": "60min", "1d": "1D"}
+
+def lttb_indices(x, y, points):
+    """
+    Largest-Triangle-Three-Buckets: indices of `points` samples that keep the visual shape of (x, y).
+    First and last points are always kept; each bucket's triangle areas are computed as one array op.
+    """
+    size = len(x)
+    if points >= size or points < 3:
+        return np.arange(size)
+    edges = np.linspace(1, size - 1, points - 1).astype(int)
+    keep = np.empty(points, dtype=int)
+    keep[0], keep[-1] = 0, size - 1
+    a = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt = slice(hi, edges[i + 2] if i + 2 < len(edges) else size)
+        avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = keep[i + 1] = lo + int(np.argmax(area))
+    return keep
+
+def downsample_chart(data, points=None, bars=None):
+    """
+    Chart payload → at most `points` LTTB-selected rows, or OHLC bars of `bars` ("1m", "5m", "15m",
+    "30m", "1h", "1d"). Payloads without a recognizable time/price column are returned unchanged.
+    """
+    if not points and not bars:
+        return df_to_json(data)
+    df = records_frame(data)
+    time_col, price_col = find_column(df, CHART_TIME_COLUMNS), find_column(df, CHART_PRICE_COLUMNS)
+    if df.empty or time_col is None or price_col is None:
+        return df_to_json(data)
+    times = pd.to_datetime(df[time_col], errors="coerce")
+    prices = pd.to_numeric(df[price_col], errors="coerce")
+    valid = (times.notna() & prices.notna()).to_numpy()
+    order = np.argsort(times[valid].to_numpy(), kind="stable")
+    df, times, prices = df[valid].iloc[order], times[valid].iloc[order], prices[valid].iloc[order]
+
+    if bars:
+        rule = CHART_BAR_RULES.get(bars.lower())
+        if rule is None:
+            raise ValueError(f"bars must be one of {', '.join(CHART_BAR_RULES)}")
+        out = prices.set_axis(times).resample(rule).ohlc().dropna()
+        volume_col = find_column(df, CHART_VOLUME_COLUMNS)
+        if volume_col is not None:
+            volume = pd.to_numeric(df[volume_col], errors="coerce").set_axis(times).resample(rule).sum()
+            out["volume"] = volume.reindex(out.index)
+        out.index = out.index.strftime("%Y-%m-%d %H:%M:%S")
+        return json_safe(out.rename_axis(time_col).reset_index())
+
+    seconds = (times - times.iloc[0]).dt.total_seconds().to_numpy()
+    return json_safe(df.iloc[lttb_indices(seconds, prices.to_numpy(dtype=float), points)].reset_index(drop=True))
+
 @mcp.tool()
-def price_chart_index(index: str = "NIFTY 50", timeframe: str = "1D"):
+def price_chart_index(index: str = "NIFTY 50", timeframe: str = "1D", points: int = None, bars: str = None):
     """
     TOOL: price_chart_index
 
@@ -2153,6 +4798,8 @@ def price_chart_index(index: str = "NIFTY 50", timeframe: str = "1D"):
                 "6M" – 6-month chart  
                 "1Y" – 1-year historical chart  
             note: The NSE server will return only the valid supported timeframes.
+        points: int – Optional: downsample to about this many points (LTTB, keeps the chart shape)
+        bars: str – Optional: resample to OHLC bars "1m" | "5m" | "15m" | "30m" | "1h" | "1d"
 
     RETURNS:
         JSON chart data containing:
@@ -2165,11 +4812,11 @@ def price_chart_index(index: str = "NIFTY 50", timeframe: str = "1D"):
         (All market chart–related tools fall under this category.)
     """
     rate_limit()
-    return df_to_json(get.index_chart(index, timeframe))
+    return downsample_chart(get.index_chart(index, timeframe), points, bars)
 
 
 @mcp.tool()
-def price_chart_stock(symbol: str, timeframe: str = "1D"):
+def price_chart_stock(symbol: str, timeframe: str = "1D", points: int = None, bars: str = None):
     """
     TOOL: price_chart_stock
 
@@ -2189,6 +4836,8 @@ def price_chart_stock(symbol: str, timeframe: str = "1D"):
                 "1M" – 1-month chart  
                 "1Y" – 1-year historical chart  
             note: The NSE server will return only the valid supported timeframes.
+        points: int – Optional: downsample to about this many points (LTTB, keeps the chart shape)
+        bars: str – Optional: resample to OHLC bars "1m" | "5m" | "15m" | "30m" | "1h" | "1d"
 
     RETURNS:
         JSON chart data containing:
@@ -2201,11 +4850,11 @@ def price_chart_stock(symbol: str, timeframe: str = "1D"):
         (All market chart–related tools fall under this category.)
     """
     rate_limit()
-    return df_to_json(get.stock_chart(symbol, timeframe))
+    return downsample_chart(get.stock_chart(symbol, timeframe), points, bars)
 
 
 @mcp.tool()
-def fno_intraday_chart(symbol: str, inst_type: str, expiry: str, strike: str = ""):
+def fno_intraday_chart(symbol: str, inst_type: str, expiry: str, strike: str = "", points: int = None, bars: str = None):
     """
     TOOL: fno_intraday_chart
 
@@ -2220,6 +4869,8 @@ def fno_intraday_chart(symbol: str, inst_type: str, expiry: str, strike: str = "
         inst_type: FUTSTK, OPTSTK, FUTIDX, OPTIDX   (FUTSTK-Stock Futures, OPTSTK-Stock Options, FUTIDX-Index Futures, OPTIDX-Index Options)
         expiry   : DD-MM-YYYY (use fno_expiry_dates_and_strikePrice to find available expiry & strike Price but expiry date must be (DD-MM-YYYY) this format only)
         strike   : CE/PE + price (options need CE/PE)
+        points   : Optional – downsample to about this many points (LTTB, keeps the chart shape)
+        bars     : Optional – resample to OHLC bars "1m" | "5m" | "15m" | "30m" | "1h" | "1d"
 
     RETURNS:
         JSON chart data containing:
@@ -2231,17 +4882,21 @@ def fno_intraday_chart(symbol: str, inst_type: str, expiry: str, strike: str = "
         (All market chart–related tools fall under this category.)
     """
     rate_limit()
-    return df_to_json(get.fno_chart(symbol, inst_type, expiry, strike))
+    return downsample_chart(get.fno_chart(symbol, inst_type, expiry, strike), points, bars)
 
 
 @mcp.tool()
-def price_chart_india_vix():
+def price_chart_india_vix(points: int = None, bars: str = None):
     """
     TOOL: price_chart_india_vix
 
     DESCRIPTION:
         Retrieves intraday chart data for the India VIX Index.
 
+    PARAMETERS:
+        points: int – Optional: downsample to about this many points (LTTB, keeps the chart shape)
+        bars: str – Optional: resample to OHLC bars "1m" | "5m" | "15m" | "30m" | "1h" | "1d"
+
     RETURNS:
         JSON chart data containing:
             - datetime_utc (string): Timestamp in UTC formatted as "%Y-%m-%d %H:%M:%S"
@@ -2252,7 +4907,7 @@ def price_chart_india_vix():
         ChartData (India Volatility Index = India VIX)
     """
     rate_limit()
-    return df_to_json(get.india_vix_chart())
+    return downsample_chart(get.india_vix_chart(), points, bars)
 
 
 @mcp.tool()
@@ -2274,8 +4929,8 @@ def symbol_full_fno_live_data(symbol: str):
     CATEGORY:
         symbol_fno_live_data
     """
-    rate_limit()
-    return get.symbol_full_fno_live_data(symbol)
+    return cached_frame("symbol_full_fno_live_data", lambda symbol: get.symbol_full_fno_live_data(symbol),
+                        ttl=LIVE_CACHE_TTL, symbol=symbol.upper())
 
 
 @mcp.tool()
@@ -2304,7 +4959,7 @@ def symbol_specific_most_active_Calls_or_Puts_or_Contracts_by_OI(symbol: str, ty
 
 
 @mcp.tool()
-def price_chart_fno_contracts(identifier: str):
+def price_chart_fno_contracts(identifier: str, prefer_local: bool = False, points: int = None, bars: str = None):
     """
     TOOL: price_chart_fno_contracts
     DESCRIPTION:
@@ -2322,6 +4977,10 @@ def price_chart_fno_contracts(identifier: str):
             symbol_full_fno_live_data
             symbol_specific_most_active_Calls_or_Puts_or_Contracts_by_OI
         )
+        prefer_local: bool – If the contract's symbol is tracked by the intraday snapshot collector,
+                             answer from the local store (sampled, no upstream call)
+        points: int – Optional: downsample to about this many points (LTTB, keeps the chart shape)
+        bars: str – Optional: resample to OHLC bars "1m" | "5m" | "15m" | "30m" | "1h" | "1d"
 
     RETURNS:
         Intraday price chart data for the specific FnO contract.
@@ -2329,8 +4988,239 @@ def price_chart_fno_contracts(identifier: str):
     CATEGORY:
         symbol_fno_live_data
     """
+    if prefer_local:
+        local = fno_snapshot_series(identifier)
+        if local is not None and not local.empty:
+            return downsample_chart(local, points, bars) if points or bars else json_safe(local)
     rate_limit()
-    return get.identifier_based_fno_contracts_live_chart_data(identifier)
+    return downsample_chart(get.identifier_based_fno_contracts_live_chart_data(identifier), points, bars)
+
+
+# ---------------------------------------------------------------------
+# Intraday F&O snapshot store (fed by the background collector)
+# ---------------------------------------------------------------------
+
+FNO_COLLECT_SYMBOLS = [s.strip().upper() for s in os.environ.get("MCP_FNO_COLLECT_SYMBOLS", "").split(",") if s.strip()]
+FNO_COLLECT_INTERVAL = float(os.environ.get("MCP_FNO_COLLECT_INTERVAL", "60"))
+FNO_SNAPSHOT_DIR = os.environ.get("MCP_FNO_SNAPSHOT_DIR", "") or (
+    os.path.join(EOD_ARCHIVE_DIR, "fno_snapshots") if EOD_ARCHIVE_DIR else ""
+)
+FNO_SNAPSHOT_FIELDS = (
+    "identifier", "instrumentType", "expiryDate", "optionType", "strikePrice", "lastPrice", "change",
+    "pChange", "openInterest", "changeinOpenInterest", "numberOfContractsTraded", "totalTradedVolume",
+    "impliedVolatility", "underlyingValue",
+)
+FNO_COMPACT_EVERY = 20   # snapshots buffered before they are folded into the columnar frame / day file
+FNO_FOLD_INTERVAL = 300  # seconds between sweeps that fold leftover parts of closed sessions
+
+# symbol → {"day": date, "frame": DataFrame | None, "pending": [DataFrame], "parts": [part paths not yet in the day file]}
+_fno_store = {}
+_fno_store_lock = Lock()
+
+def _fno_store_entry(symbol, day):
+    entry = _fno_store.get(symbol)
+    if entry is None or entry["day"] != day:
+        entry = _fno_store[symbol] = {"day": day, "frame": None, "pending": [], "parts": []}
+    return entry
+
+def _fno_day_paths(symbol, day):
+    """On-disk layout: <dir>/<SYMBOL>/<YYYY-MM-DD>.parquet plus a <YYYY-MM-DD>/ folder of not-yet-compacted parts."""
+    folder = os.path.join(FNO_SNAPSHOT_DIR, symbol, day.isoformat())
+    return folder + ".parquet", folder
+
+def _parquet_ready(df):
+    return df.astype({c: "string" for c in df.columns[df.dtypes == object]})
+
+def read_fno_day(symbol, day):
+    """The day file plus any leftover parts (rows already folded into the day file are skipped)."""
+    day_file, folder = _fno_day_paths(symbol, day)
+    frame = pd.read_parquet(day_file) if os.path.exists(day_file) else None
+    parts = sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(".parquet")) \
+        if os.path.isdir(folder) else []
+    tail = pd.concat([pd.read_parquet(f) for f in parts], ignore_index=True) if parts else None
+    if frame is not None and tail is not None:
+        tail = tail[tail["snapshot_time"] > frame["snapshot_time"].max()]
+    frames = [f for f in (frame, tail) if f is not None]
+    return (pd.concat(frames, ignore_index=True) if frames else None), parts
+
+def _write_fno_day(day_file, frame, folded):
+    """Atomically replaces the day file with frame, then removes the parts it now contains."""
+    tmp = day_file + ".tmp"
+    _parquet_ready(frame).to_parquet(tmp, index=False)
+    os.replace(tmp, day_file)
+    for f in folded:
+        try:
+            os.remove(f)
+        except OSError:
+            pass
+
+def fold_fno_day(symbol, day):
+    """Folds a day's leftover parts (from disk) into its day file; returns the number of parts folded."""
+    frame, parts = read_fno_day(symbol, day)
+    if parts:
+        day_file, folder = _fno_day_paths(symbol, day)
+        _write_fno_day(day_file, frame, parts)
+        try:
+            os.rmdir(folder)
+        except OSError:
+            pass
+    return len(parts)
+
+def fold_fno_leftovers(now=None):
+    """
+    Folds the parts that never reached FNO_COMPACT_EVERY: every day before today (day rollover, or a
+    restart), and today once the session has closed (two collection intervals after 15:30, so an
+    in-flight sample is not cut off).
+    """
+    if not (FNO_SNAPSHOT_DIR and archive_enabled() and os.path.isdir(FNO_SNAPSHOT_DIR)):
+        return
+    now = now or dt.datetime.now(IST)
+    today = now.date()
+    closed = now.replace(tzinfo=None) > (
+        dt.datetime.combine(today, MARKET_CLOSE) + dt.timedelta(seconds=2 * FNO_COLLECT_INTERVAL)
+    )
+    failures = []
+    for symbol in sorted(os.listdir(FNO_SNAPSHOT_DIR)):
+        root = os.path.join(FNO_SNAPSHOT_DIR, symbol)
+        for name in sorted(os.listdir(root)) if os.path.isdir(root) else []:
+            try:
+                day = dt.date.fromisoformat(name)
+            except ValueError:
+                continue   # day files (<date>.parquet) and temporaries
+            if day > today or (day == today and not closed):
+                continue
+            try:
+                fold_fno_day(symbol, day)
+            except Exception as e:
+                failures.append(f"{symbol} {day}: {type(e).__name__}: {e}")
+                continue
+            if day == today:
+                with _fno_store_lock:
+                    entry = _fno_store.get(symbol)
+                    if entry is not None and entry["day"] == day:
+                        entry["parts"] = []
+    if failures:
+        raise RuntimeError("; ".join(failures))
+
+def load_fno_snapshots():
+    """
+    Folds leftover parts of earlier days, then reloads today's on-disk snapshots into the store so a
+    restart keeps the intraday history.
+    """
+    if not (FNO_SNAPSHOT_DIR and archive_enabled() and os.path.isdir(FNO_SNAPSHOT_DIR)):
+        return
+    try:
+        fold_fno_leftovers()
+    except RuntimeError as e:
+        print(f"[fno_snapshots] could not fold earlier days: {e}")
+    today = dt.datetime.now(IST).date()
+    for symbol in sorted(os.listdir(FNO_SNAPSHOT_DIR)):
+        try:
+            frame, parts = read_fno_day(symbol, today)
+        except Exception as e:
+            print(f"[fno_snapshots] could not reload {symbol}: {type(e).__name__}: {e}")
+            continue
+        if frame is None:
+            continue
+        with _fno_store_lock:
+            entry = _fno_store_entry(symbol, today)
+            entry["pending"].insert(0, frame)
+            entry["parts"] = parts + entry["parts"]
+            _compact_fno(entry)
+
+def persist_fno_snapshot(symbol, now, df):
+    """
+    Writes the sample as a small part file, and every FNO_COMPACT_EVERY parts rewrites the symbol's
+    day file from the compacted frame and removes the folded parts (one file per symbol per day).
+    """
+    day_file, folder = _fno_day_paths(symbol, now.date())
+    os.makedirs(folder, exist_ok=True)
+    part = os.path.join(folder, f"{now:%H%M%S}.parquet")
+    _parquet_ready(df).to_parquet(part, index=False)
+
+    with _fno_store_lock:
+        entry = _fno_store_entry(symbol, now.date())
+        entry["parts"].append(part)
+        if len(entry["parts"]) < FNO_COMPACT_EVERY:
+            return
+        frame, folded, entry["parts"] = _compact_fno(entry), entry["parts"], []
+    _write_fno_day(day_file, frame, folded)
+
+def _compact_fno(entry):
+    """Folds pending snapshots into one frame with categorical identifiers (caller holds the lock)."""
+    if entry["pending"]:
+        parts = ([entry["frame"]] if entry["frame"] is not None else []) + entry["pending"]
+        frame = pd.concat(parts, ignore_index=True)
+        for col in ("identifier", "instrumentType", "expiryDate", "optionType"):
+            if col in frame.columns:
+                frame[col] = frame[col].astype("category")
+        entry["frame"], entry["pending"] = frame, []
+    return entry["frame"]
+
+def collect_fno_snapshot(symbol):
+    """Samples symbol_full_fno_live_data once into the in-memory store and the on-disk log."""
+    now = dt.datetime.now(IST)
+    df = records_frame(symbol_full_fno_live_data(symbol))
+    df = coerce_numeric(df[[c for c in FNO_SNAPSHOT_FIELDS if c in df.columns]])
+    df.insert(0, "snapshot_time", pd.Timestamp(now.replace(tzinfo=None)))
+
+    with _fno_store_lock:
+        entry = _fno_store_entry(symbol, now.date())
+        entry["pending"].append(df)
+        if len(entry["pending"]) >= FNO_COMPACT_EVERY:
+            _compact_fno(entry)
+
+    if FNO_SNAPSHOT_DIR and archive_enabled():
+        persist_fno_snapshot(symbol, now, df)
+
+def collect_fno_snapshots():
+    for symbol in FNO_COLLECT_SYMBOLS:
+        collect_fno_snapshot(symbol)
+
+def fno_snapshot_frame(symbol):
+    """Today's snapshots of a tracked symbol as one frame (None if not tracked/collected)."""
+    with _fno_store_lock:
+        entry = _fno_store.get(symbol.upper())
+        return None if entry is None else _compact_fno(entry)
+
+def fno_snapshot_series(identifier):
+    """Intraday series of one contract from the local store, or None if its symbol is not tracked."""
+    match = re.match(r"^(?:OPT|FUT)(?:IDX|STK)(.+?)\d{2}-\d{2}-\d{4}", identifier.upper())
+    frame = fno_snapshot_frame(match.group(1)) if match else None
+    if frame is None or "identifier" not in frame.columns:
+        return None
+    return frame[frame["identifier"] == identifier].reset_index(drop=True)
+
+@mcp.tool()
+def fno_intraday_snapshots(symbol: str, identifier: str = None, since: str = None, latest_only: bool = False):
+    """
+    TOOL: fno_intraday_snapshots
+    DESCRIPTION:
+        Intraday OI / price evolution of F&O contracts from the server's snapshot store
+        (no upstream call). Symbols are sampled every MCP_FNO_COLLECT_INTERVAL seconds during
+        market hours when listed in MCP_FNO_COLLECT_SYMBOLS.
+    PARAMETERS:
+        symbol: str – Tracked underlying, e.g. "NIFTY"
+        identifier: str – Optional contract identifier, e.g. "OPTIDXNIFTY28-10-2025CE25000.00"
+        since: str – Optional "HH:MM" (IST) lower bound on snapshot_time
+        latest_only: bool – Only the most recent snapshot of every contract
+    RETURNS:
+        Rows of snapshot_time, identifier, lastPrice, openInterest, changeinOpenInterest, volume, IV, ...
+    CATEGORY:
+        symbol_fno_live_data
+    """
+    symbol = symbol.upper()
+    frame = fno_snapshot_frame(symbol)
+    if frame is None or frame.empty:
+        return {"error": f"{symbol} is not tracked or has no snapshots yet", "tracked": FNO_COLLECT_SYMBOLS}
+    if identifier:
+        frame = frame[frame["identifier"] == identifier]
+    if since:
+        hour, minute = (int(x) for x in since.split(":"))
+        frame = frame[frame["snapshot_time"].dt.time >= dt.time(hour, minute)]
+    if latest_only:
+        frame = frame[frame["snapshot_time"] == frame["snapshot_time"].max()]
+    return json_safe(frame.reset_index(drop=True))
 
 
 @mcp.tool()
@@ -2418,6 +5308,7 @@ def pre_market_analysis() -> str:
         "Rules:\n"
         "- Use only NseKit-MCP tools\n"
         "- Do not assume prices or direction\n"
+        "- Fetch independent data in one `batch` call instead of sequential tool calls\n"
     )
 
 @mcp.prompt()
@@ -2432,6 +5323,7 @@ def market_overview() -> str:
         "5. Most active stocks by value\n"
         "6. FII/DII activity\n"
         "7. India VIX level\n\n"
+        "Fetch the independent data points together with a single `batch` tool call.\n"
         "Present in a clean, organized format."
     )
 
@@ -2517,6 +5409,7 @@ def daily_market_wrap() -> str:
         "7. Notable corporate actions\n"
         "8. F&O highlights (OI changes, rollovers)\n\n"
         "Use today's date for EOD data.\n"
+        "Fetch the independent data points together with a single `batch` tool call.\n"
         "Format as a professional market report."
     )
 
@@ -2690,6 +5583,9 @@ def intraday_scanner_fno_only() -> str:
         "Your task is to identify high-probability intraday trade setups using ONLY F&O stocks "
         "and ONLY NseKit-MCP tools, without assumptions or discretionary bias.\n\n"
 
+        "Start with fno_intraday_scan for a ranked shortlist of F&O candidates with volume, OI and "
+        "option-activity evidence; use the prompts below to confirm and refine that shortlist.\n\n"
+
         "=============================\n"
         "UNIVERSE DEFINITION (MANDATORY)\n"
         "=============================\n"
@@ -2849,6 +5745,615 @@ def intraday_scanner_fno_only() -> str:
         "- Do NOT assume direction or price\n"
         "- Risk management is mandatory\n"
         "- Capital preservation is priority\n"
+        "- Run each prompt's independent tool calls together in one `batch` call\n"
+    )
+
+# =====================================================================
+# TOOL LISTING (compact descriptions / category allowlist)
+# =====================================================================
+
+_full_tool_docs = {}
+
+def _docstring_section(doc, section):
+    """Lines under `SECTION:` in a TOOL docstring, up to the next section header."""
+    lines, capture = [], False
+    for line in inspect.cleandoc(doc or "").splitlines():
+        header = re.match(r"^([A-Z_]+):\s*(.*)$", line)
+        if header:
+            capture = header.group(1) == section
+            line = header.group(2)
+        if capture and line.strip():
+            lines.append(line.strip())
+    return lines
+
+def tool_category(doc):
+    """Leading category token: "ChartData (India Volatility Index = India VIX)" → "ChartData"."""
+    category = _docstring_section(doc, "CATEGORY")
+    match = re.match(r"[\w&-]+", category[0]) if category else None
+    return match.group(0) if match else None
+
+def _category_allowed(category, allowlist):
+    if not allowlist:
+        return True
+    category = (category or "").lower()
+    return any(category == a or category.startswith(a + "_") for a in allowlist)
+
+@mcp.tool()
+def tool_help(name: str = None):
+    """
+    TOOL: tool_help
+    DESCRIPTION:
+        Full documentation (parameters, accepted values, examples) for any tool.
+        Use this when a tool's short description is not enough.
+    PARAMETERS:
+        name: str – Tool name, e.g. "index_live_constituents". Omit to list tools by category.
+    RETURNS:
+        Full docstring text, or {category: [tool names]}
+    CATEGORY:
+        Meta
+    """
+    if name is None:
+        by_category = {}
+        for tool in mcp._tool_manager.list_tools():
+            doc = _full_tool_docs.get(tool.name, tool.description)
+            by_category.setdefault(tool_category(doc) or "Other", []).append(tool.name)
+        return by_category
+
+    tool = mcp._tool_manager.get_tool(name)
+    if tool is None:
+        return {"error": f"Unknown tool '{name}'"}
+    return _full_tool_docs.get(name) or inspect.cleandoc(tool.fn.__doc__ or tool.description or "")
+
+@mcp.resource("nsekit://help/{name}")
+def tool_help_resource(name: str) -> str:
+    """Full documentation for one NseKit-MCP tool."""
+    return str(tool_help(name))
+
+def unregister_tool(name):
+    """
+    Removes a registered tool. Older mcp 1.x releases have no public remove_tool, so this falls back
+    to FastMCP's private ToolManager._tools dict; it is the only place that touches it and the
+    first thing to check after an mcp upgrade.
+    """
+    if hasattr(mcp, "remove_tool"):
+        mcp.remove_tool(name)
+    else:
+        mcp._tool_manager._tools.pop(name, None)
+
+def configure_tool_listing(mode=None, categories=None):
+    """
+    Applies MCP_TOOL_DESCRIPTIONS ("full" | "compact") and the MCP_TOOL_CATEGORIES
+    allowlist to the registered tools. tool_help is always kept.
+    """
+    mode = (mode or MCP_TOOL_DESCRIPTIONS).lower()
+    allowlist = [c.lower() for c in (categories if categories is not None else MCP_TOOL_CATEGORIES)]
+    for tool in mcp._tool_manager.list_tools():
+        name = tool.name
+        doc = _full_tool_docs.setdefault(name, inspect.cleandoc(tool.fn.__doc__ or tool.description or ""))
+        if name != "tool_help" and not _category_allowed(tool_category(doc), allowlist):
+            unregister_tool(name)
+            continue
+        if mode == "compact":
+            summary = _docstring_section(doc, "DESCRIPTION")
+            short = summary[0] if summary else doc.splitlines()[0] if doc else name
+            tool.description = f"{short} (details: tool_help('{name}'))"
+
+# =====================================================================
+# BATCH EXECUTION (many tool calls in one request)
+# =====================================================================
+
+BATCH_MAX_CALLS = int(os.environ.get("MCP_BATCH_MAX_CALLS", "32"))
+
+async def _run_tool(name, args):
+    tool = mcp._tool_manager.get_tool(name)
+    if tool is None or name == "batch":
+        raise ValueError(f"Unknown or non-batchable tool '{name}'")
+    kwargs = tool.fn_metadata.arg_model.model_validate(args or {}).model_dump_one_level()
+    if tool.context_kwarg:
+        kwargs[tool.context_kwarg] = None
+    if tool.is_async:
+        return await tool.fn(**kwargs)
+    # Sync tools run on the default executor (not _fetch_pool, which they may use themselves);
+    # upstream calls are still serialized by rate_limit() and shared through the frame cache.
+    return await asyncio.to_thread(tool.fn, **kwargs)
+
+@mcp.tool()
+async def batch(calls: list[dict], deadline_seconds: float = 30.0):
+    """
+    TOOL: batch
+    DESCRIPTION:
+        Run many independent tool calls concurrently in ONE request; wall time ≈ the slowest call.
+        Use for workflows that need several unrelated data points (status, VIX, FII/DII, breadth, ...).
+    PARAMETERS:
+        calls: list – [{"id": "vix", "tool": "india_vix", "args": {"period": "1M"}}, ...]
+                      "id" defaults to the position in the list; "args" defaults to {}.
+        deadline_seconds: float – Overall deadline; unfinished calls are reported in "timed_out"
+    RETURNS:
+        {"results": {id: result}, "errors": {id: message}, "timed_out": [ids], "elapsed_seconds": float}
+    CATEGORY:
+        Meta
+    EXAMPLES:
+        batch([{"id": "status", "tool": "market_live_status"},
+               {"id": "vix", "tool": "india_vix", "args": {"period": "1W"}},
+               {"id": "fii", "tool": "fii_dii_activity"}])
+    """
+    if len(calls) > BATCH_MAX_CALLS:
+        return {"error": f"At most {BATCH_MAX_CALLS} calls per batch"}
+
+    started = time.monotonic()
+    tasks, errors = {}, {}
+    for position, call in enumerate(calls):
+        call_id = str(call.get("id", position))
+        if call_id in tasks or call_id in errors:
+            errors[f"{call_id}#{position}"] = "Duplicate id"
+            continue
+        tasks[call_id] = asyncio.ensure_future(_run_tool(call.get("tool"), call.get("args")))
+
+    done, pending = await asyncio.wait(tasks.values(), timeout=deadline_seconds) if tasks else (set(), set())
+    for task in pending:
+        task.cancel()
+
+    results = {}
+    for call_id, task in tasks.items():
+        if task in done:
+            if task.exception() is not None:
+                errors[call_id] = f"{type(task.exception()).__name__}: {task.exception()}"
+            else:
+                results[call_id] = task.result()
+    return {
+        "results": results,
+        "errors": errors,
+        "timed_out": [call_id for call_id, task in tasks.items() if task in pending],
+        "elapsed_seconds": round(time.monotonic() - started, 3),
+    }
+
+# =====================================================================
+# LIVE RESOURCES & SUBSCRIPTIONS (server-pushed resources/updated)
+# =====================================================================
+
+RESOURCE_PUSH_INTERVAL = float(os.environ.get("MCP_RESOURCE_PUSH_INTERVAL", "5"))
+
+_subscribers = {}          # uri → set of ServerSession
+_resource_payloads = {}    # uri → (fetched_at, json text)
+_resource_lock = Lock()
+_push_task = None
+
+def _live_resource_data(uri):
+    """Fetches the data behind a live resource URI (through the shared live cache)."""
+    if uri == "nse://market/status":
+        return source_frame("market_live_status", mode="Market Status")
+    if uri == "nse://indices/live":
+        data = latest_indices_snapshot()
+        return data if data is not None else source_frame("indices_live_data")
+    if uri == "nse://alerts/events":
+        return alert_event_log(limit=ALERT_PUSH_EVENTS)
+    match = re.fullmatch(r"nse://option-chain/([^/]+)/([^/]+)", uri)
+    if match:
+        symbol, expiry = match.group(1).upper(), match.group(2)
+        expiry = None if expiry.lower() == "current" else expiry
+        return source_frame("fno_live_option_chain", symbol=symbol, expiry=expiry, compact=False)
+    raise ValueError(f"Unknown live resource {uri}")
+
+def live_resource_payload(uri, max_age=None):
+    """JSON text of a live resource; one fetch per push interval is shared by every reader."""
+    max_age = RESOURCE_PUSH_INTERVAL if max_age is None else max_age
+    with _resource_lock:
+        cached = _resource_payloads.get(uri)
+    if cached is not None and time.time() - cached[0] < max_age:
+        return cached[1]
+    data = _live_resource_data(uri)
+    text = json.dumps(json_safe(data) if isinstance(data, pd.DataFrame) else data, default=str)
+    with _resource_lock:
+        _resource_payloads[uri] = (time.time(), text)
+    return text
+
+@mcp.resource("nse://market/status", mime_type="application/json")
+def market_status_resource() -> str:
+    """Live NSE market status (subscribe for resources/updated notifications)."""
+    return live_resource_payload("nse://market/status")
+
+@mcp.resource("nse://indices/live", mime_type="application/json")
+def indices_live_resource() -> str:
+    """Live snapshot of all NSE indices (subscribe for resources/updated notifications)."""
+    return live_resource_payload("nse://indices/live")
+
+@mcp.resource("nse://option-chain/{symbol}/{expiry}", mime_type="application/json")
+def option_chain_resource(symbol: str, expiry: str) -> str:
+    """Live option chain; expiry "DD-MMM-YYYY" or "current" (subscribe for resources/updated notifications)."""
+    return live_resource_payload(f"nse://option-chain/{symbol.upper()}/{expiry}")
+
+async def _push_updates():
+    """
+    Every RESOURCE_PUSH_INTERVAL: refresh each subscribed resource ONCE and, if its content
+    changed, notify all of its subscribers. Cost is per resource, not per subscriber.
+    A newly subscribed resource is baselined on the payload its subscribers last read (no notification),
+    and a session whose send fails is dropped from every subscription.
+    """
+    last_sent = {}
+    while True:
+        await asyncio.sleep(RESOURCE_PUSH_INTERVAL)
+        with _resource_lock:
+            active = {uri: set(sessions) for uri, sessions in _subscribers.items() if sessions}
+            baselines = {uri: _resource_payloads.get(uri) for uri in active if uri not in last_sent}
+        for uri in set(last_sent) - set(active):
+            del last_sent[uri]
+        for uri, sessions in active.items():
+            try:
+                text = await asyncio.to_thread(live_resource_payload, uri, 0)
+            except Exception:
+                continue
+            digest = hash(text)
+            if uri in baselines:
+                last_sent[uri] = hash(baselines[uri][1]) if baselines[uri] is not None else digest
+            if last_sent[uri] == digest:
+                continue
+            last_sent[uri] = digest
+            for session in sessions:
+                try:
+                    await session.send_resource_updated(AnyUrl(uri))
+                except Exception:
+                    drop_subscriber(session)
+
+def drop_subscriber(session):
+    """Removes a (closed) session from every subscription."""
+    with _resource_lock:
+        for uri in list(_subscribers):
+            _subscribers[uri].discard(session)
+            if not _subscribers[uri]:
+                del _subscribers[uri]
+
+@mcp._mcp_server.subscribe_resource()
+async def subscribe_live_resource(uri) -> None:
+    global _push_task
+    uri = str(uri)
+    if not uri.startswith(("nse://market/status", "nse://indices/live", "nse://option-chain/", "nse://alerts/")):
+        raise ValueError(f"{uri} does not support subscriptions")
+    session = mcp._mcp_server.request_context.session
+    with _resource_lock:
+        _subscribers.setdefault(uri, set()).add(session)
+    if _push_task is None or _push_task.done():
+        _push_task = asyncio.get_running_loop().create_task(_push_updates())
+
+@mcp._mcp_server.unsubscribe_resource()
+async def unsubscribe_live_resource(uri) -> None:
+    session = mcp._mcp_server.request_context.session
+    with _resource_lock:
+        _subscribers.get(str(uri), set()).discard(session)
+
+def subscription_summary():
+    with _resource_lock:
+        return {uri: len(sessions) for uri, sessions in _subscribers.items() if sessions}
+
+# Advertise resources.subscribe in the initialize response now that handlers exist.
+_base_capabilities = mcp._mcp_server.get_capabilities
+
+def _capabilities_with_subscribe(*args, **kwargs):
+    capabilities = _base_capabilities(*args, **kwargs)
+    if capabilities.resources is not None:
+        capabilities.resources.subscribe = True
+    return capabilities
+
+mcp._mcp_server.get_capabilities = _capabilities_with_subscribe
+
+# =====================================================================
+# ALERT ENGINE (rules evaluated on background refreshes)
+# =====================================================================
+
+ALERT_INTERVAL = float(os.environ.get("MCP_ALERT_INTERVAL", "15"))
+ALERT_MAX_RULES = int(os.environ.get("MCP_ALERT_MAX_RULES", "200"))
+ALERT_PUSH_EVENTS = 50
+ALERT_COMPARATORS = {
+    ">": lambda v, x: v > x,
+    ">=": lambda v, x: v >= x,
+    "<": lambda v, x: v < x,
+    "<=": lambda v, x: v <= x,
+}
+ALERT_LIVE_SOURCES = ("fno_live_change_in_oi", "equity_52week_high_live", "equity_52week_low_live", "equity_volume_surge")
+
+_alert_rules = {}                    # rule id → rule
+_alert_events = deque(maxlen=1000)
+_alert_previous = {}                 # dataset → keyed frame from the last evaluation
+_alert_lock = Lock()
+_alert_rule_ids = itertools.count(1)
+_alert_event_ids = itertools.count(1)
+
+def alert_frame(dataset):
+    """
+    Keyed live frame for an alert dataset:
+    "index_constituents:<INDEX>", "indices_live", "option_chain:<SYMBOL>[:<expiry selector>]",
+    or one of ALERT_LIVE_SOURCES.
+    """
+    kind, _, arg = dataset.partition(":")
+    kind = kind.lower()
+    if kind == "index_constituents":
+        df = source_frame("index_live_constituents", index_name=arg.upper(), list_only=False)
+        return _keyed(df, CONSTITUENT_KEYS)
+    if kind == "indices_live":
+        df = latest_indices_snapshot()
+        return _keyed(df if df is not None else source_frame("indices_live_data"), INDICES_KEYS)
+    if kind == "option_chain":
+        symbol, _, selector = arg.partition(":")
+        expiry = resolve_expiries(symbol, selector or "current")[0]
+        return _keyed(option_chain_long(symbol, expiry), (("strike",), ("option_type",)))
+    if kind in ALERT_LIVE_SOURCES:
+        return _keyed(records_frame(source_frame(kind)), (("symbol", "underlying", "Symbol"),))
+    raise ValueError(f"Unknown alert dataset '{dataset}'")
+
+def check_alert_dataset(dataset):
+    """Rejects datasets alert_frame cannot resolve, so a typo fails at creation rather than on every refresh."""
+    kind, _, arg = dataset.partition(":")
+    kind = kind.lower()
+    if kind in ("index_constituents", "option_chain"):
+        if not arg.strip():
+            raise ValueError(f"'{kind}' needs an argument, e.g. "
+                             f"{'index_constituents:NIFTY 50' if kind == 'index_constituents' else 'option_chain:NIFTY'}")
+    elif kind != "indices_live" and kind not in ALERT_LIVE_SOURCES:
+        raise ValueError(f"Unknown alert dataset '{dataset}'. Available: index_constituents:<INDEX>, indices_live, "
+                         f"option_chain:<SYMBOL>[:<expiry selector>], {', '.join(ALERT_LIVE_SOURCES)}")
+
+def _alert_mask(rule, frame):
+    values = pd.to_numeric(frame[rule["column"]], errors="coerce")
+    return ALERT_COMPARATORS[rule["op"]](values, rule["value"]).fillna(False).to_numpy(dtype=bool)
+
+def evaluate_rule(rule, frame, previous):
+    """
+    Rows that newly satisfy the rule: the condition holds now but did not for the same key in the
+    previous refresh (edge-triggered), or — for op "enters" — keys absent from the previous refresh.
+    """
+    if rule["op"] == "enters":
+        if previous is None:
+            return frame.iloc[:0]
+        hits = frame[~frame.index.isin(previous.index)]
+    else:
+        now = _alert_mask(rule, frame)
+        before = np.zeros(len(frame), dtype=bool)
+        if previous is not None and rule["column"] in previous.columns:
+            prev_mask = pd.Series(_alert_mask(rule, previous), index=previous.index)
+            prev_mask = prev_mask[~prev_mask.index.duplicated()]
+            before = prev_mask.reindex(frame.index, fill_value=False).to_numpy(dtype=bool)
+        hits = frame[now & ~before]
+    if rule["symbols"]:
+        col = find_column(hits, ("symbol", "underlying", "indexSymbol", "index"))
+        if col is not None:
+            hits = hits[hits[col].astype(str).str.upper().isin(rule["symbols"])]
+    return hits
+
+def evaluate_alerts():
+    """One evaluation pass: each referenced dataset is fetched once and every rule on it is applied."""
+    with _alert_lock:
+        rules = [r for r in _alert_rules.values() if r["active"]]
+    by_dataset = {}
+    for rule in rules:
+        by_dataset.setdefault(rule["dataset"], []).append(rule)
+
+    for dataset, dataset_rules in by_dataset.items():
+        try:
+            frame = alert_frame(dataset)
+        except Exception as e:
+            for rule in dataset_rules:
+                rule["last_error"] = f"{type(e).__name__}: {e}"
+            continue
+        previous = _alert_previous.get(dataset)
+        now = dt.datetime.now(IST).isoformat(timespec="seconds")
+        for rule in dataset_rules:
+            if rule["op"] != "enters" and rule["column"] not in frame.columns:
+                rule["last_error"] = f"Column '{rule['column']}' not in {dataset}"
+                continue
+            hits = evaluate_rule(rule, frame, previous)
+            if hits.empty:
+                continue
+            with _alert_lock:
+                _alert_events.append({
+                    "id": next(_alert_event_ids),
+                    "rule_id": rule["id"],
+                    "time": now,
+                    "dataset": dataset,
+                    "condition": f"{rule['column']} {rule['op']} {rule['value']}" if rule["op"] != "enters" else "enters",
+                    "rows": json_safe(hits.reset_index(drop=True).head(50)),
+                })
+                rule["fired"] += 1
+                if rule["once"]:
+                    rule["active"] = False
+        _alert_previous[dataset] = frame
+
+def alert_event_log(since_id=0, limit=100):
+    with _alert_lock:
+        events = [e for e in _alert_events if e["id"] > since_id]
+    return events[-limit:]
+
+@mcp.tool()
+def alert_create(dataset: str, column: str = None, op: str = ">", value: float = None,
+                 symbols: list[str] = None, once: bool = False):
+    """
+    TOOL: alert_create
+    DESCRIPTION:
+        Register a server-side alert rule instead of polling. Rules are evaluated on every background
+        refresh (MCP_ALERT_INTERVAL, market hours) and fire when a row NEWLY meets the condition.
+        Matches are read with alert_events or pushed to subscribers of resource nse://alerts/events.
+    PARAMETERS:
+        dataset: str – "index_constituents:NIFTY 50" | "indices_live" | "option_chain:NIFTY[:current|next|monthly]" |
+                       "fno_live_change_in_oi" | "equity_52week_high_live" | "equity_52week_low_live" | "equity_volume_surge"
+        column: str – Numeric column to test, e.g. "lastPrice", "pChange", "openInterest" (not needed for op "enters")
+        op: str – ">" | ">=" | "<" | "<=" | "enters" (row appears in the dataset, e.g. a new 52-week high)
+        value: float – Threshold for comparison ops
+        symbols: list[str] – Optional: only these symbols / indices
+        once: bool – Deactivate the rule after its first match
+    RETURNS:
+        The created rule with its id
+    CATEGORY:
+        Alerts
+    EXAMPLES:
+        alert_create("index_constituents:NIFTY 50", "lastPrice", ">", 3000, symbols=["RELIANCE"])
+        alert_create("option_chain:NIFTY", "changeinOpenInterest", ">", 500000)
+        alert_create("equity_52week_high_live", op="enters")
+    """
+    if op not in ALERT_COMPARATORS and op != "enters":
+        return {"error": f"op must be one of {', '.join(ALERT_COMPARATORS)}, enters"}
+    if op != "enters" and (column is None or value is None):
+        return {"error": "column and value are required for comparison rules"}
+    dataset = dataset.strip()
+    try:
+        check_alert_dataset(dataset)
+    except ValueError as e:
+        return {"error": str(e)}
+    with _alert_lock:
+        if sum(r["active"] for r in _alert_rules.values()) >= ALERT_MAX_RULES:
+            return {"error": f"At most {ALERT_MAX_RULES} active rules"}
+        rule = {
+            "id": next(_alert_rule_ids),
+            "dataset": dataset,
+            "column": column,
+            "op": op,
+            "value": value,
+            "symbols": [s.strip().upper() for s in symbols or []],
+            "once": once,
+            "active": True,
+            "fired": 0,
+            "last_error": None,
+        }
+        _alert_rules[rule["id"]] = rule
+    start_background_job("alerts", ALERT_INTERVAL, evaluate_alerts)
+    return rule
+
+@mcp.tool()
+def alert_list():
+    """
+    TOOL: alert_list
+    DESCRIPTION:
+        All registered alert rules with status (active, times fired, last error).
+    RETURNS:
+        JSON list of rules
+    CATEGORY:
+        Alerts
+    """
+    with _alert_lock:
+        return [dict(r) for r in _alert_rules.values()]
+
+@mcp.tool()
+def alert_delete(rule_id: int):
+    """
+    TOOL: alert_delete
+    DESCRIPTION:
+        Remove an alert rule.
+    PARAMETERS:
+        rule_id: int – id returned by alert_create
+    RETURNS:
+        {"deleted": bool}
+    CATEGORY:
+        Alerts
+    """
+    with _alert_lock:
+        return {"deleted": _alert_rules.pop(rule_id, None) is not None}
+
+@mcp.tool()
+def alert_events(since_id: int = 0, limit: int = 100):
+    """
+    TOOL: alert_events
+    DESCRIPTION:
+        Alert matches recorded by the server (pull endpoint). Pass the last seen event id as since_id.
+    PARAMETERS:
+        since_id: int – Only events with a larger id
+        limit: int – Maximum events returned (most recent)
+    RETURNS:
+        JSON list of {id, rule_id, time, dataset, condition, rows}
+    CATEGORY:
+        Alerts
+    """
+    return alert_event_log(since_id, limit)
+
+@mcp.resource("nse://alerts/events", mime_type="application/json")
+def alert_events_resource() -> str:
+    """Most recent alert matches (subscribe to be notified when new ones arrive)."""
+    return live_resource_payload("nse://alerts/events")
+
+# =====================================================================
+# BULK EXPORT (Arrow IPC / Parquet) – served next to /mcp
+# =====================================================================
+
+EXPORT_MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Encoded payloads keyed by (source, params, format); the cached frame is kept
+# alongside so a payload is reused only while the frame cache still serves it.
+_export_payloads = OrderedDict()
+_export_lock = Lock()
+
+def _encode_frame(df, fmt):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return memoryview(sink.getvalue())
+
+def export_payload(name, fmt, **params):
+    """
+    Serializes a FRAME_SOURCES dataset, reusing the encoding while its frame is cached.
+    EOD datasets go through eod_frame, so archived dates are served from the local Parquet archive.
+    """
+    df = eod_frame(name, params["date"]) if name in EOD_SOURCES else source_frame(name, **params)
+    if not isinstance(df, pd.DataFrame):
+        return None
+
+    key = (name, fmt, tuple(sorted((k, v) for k, v in params.items() if v is not None)))
+    with _export_lock:
+        entry = _export_payloads.get(key)
+        if entry is not None and entry[0] is df:
+            return entry[1]
+
+    payload = _encode_frame(df, fmt)
+    with _export_lock:
+        _export_payloads[key] = (df, payload)
+        _export_payloads.move_to_end(key)
+        while len(_export_payloads) > FRAME_CACHE_MAX_ENTRIES:
+            _export_payloads.popitem(last=False)
+    return payload
+
+@mcp.custom_route("/export/{name}", methods=["GET"])
+async def export_frame(request: Request) -> Response:
+    """
+    GET /export/<tool>?format=arrow|parquet&<tool args>
+    e.g. /export/fno_bhavcopy?date=17-10-2025&format=parquet
+    """
+    name = request.path_params["name"]
+    params = dict(request.query_params)
+    fmt = params.pop("format", "arrow").lower()
+
+    if name not in FRAME_SOURCES:
+        return JSONResponse(
+            {"error": f"Unknown export source '{name}'", "available": sorted(FRAME_SOURCES)}, status_code=404,
+        )
+    if fmt not in EXPORT_MEDIA_TYPES:
+        return JSONResponse({"error": "format must be 'arrow' or 'parquet'"}, status_code=400)
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return JSONResponse({"error": "Bulk export requires pyarrow: pip install 'nsekit-mcp[export]'"}, status_code=501)
+
+    try:
+        params = coerce_query_params(FRAME_SOURCES[name][0], params)
+    except ValueError as e:
+        return JSONResponse({"error": f"Invalid parameters for '{name}': {e}"}, status_code=400)
+    try:
+        payload = await run_in_threadpool(export_payload, name, fmt, **params)
+    except Exception as e:
+        return JSONResponse({"error": f"Upstream fetch for '{name}' failed: {type(e).__name__}: {e}"}, status_code=502)
+
+    if payload is None:
+        return JSONResponse({"error": f"No tabular data for '{name}'", "params": params}, status_code=404)
+
+    ext = "arrows" if fmt == "arrow" else "parquet"
+    return Response(
+        payload,
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{ext}"'},
     )
 
 # =====================================================================
@@ -2887,16 +6392,187 @@ class BearerAuthMiddleware:
 
         await self.app(scope, receive, send)
 
+# =====================================================================
+# RESPONSE COMPRESSION MIDDLEWARE (gzip / zstd / brotli)
+# =====================================================================
+
+COMPRESSIBLE_TYPES = ("application/json", "text/plain", "text/csv", "application/vnd.apache.arrow.stream")
+
+def _gzip_compressor(level):
+    import gzip
+    return lambda body: gzip.compress(body, compresslevel=level if level is not None else 6)
+
+def _zstd_compressor(level):
+    import zstandard
+    cctx = zstandard.ZstdCompressor(level=level if level is not None else 3)
+    return cctx.compress
+
+def _brotli_compressor(level):
+    import brotli
+    return lambda body: brotli.compress(body, quality=level if level is not None else 4)
+
+_COMPRESSOR_FACTORIES = {"zstd": _zstd_compressor, "br": _brotli_compressor, "gzip": _gzip_compressor}
+
+compression_stats = {}
+_compression_stats_lock = Lock()
+
+def _record_compression(encoding, size_in, size_out, seconds):
+    with _compression_stats_lock:
+        stats = compression_stats.setdefault(
+            encoding, {"responses": 0, "bytes_in": 0, "bytes_out": 0, "seconds": 0.0}
+        )
+        stats["responses"] += 1
+        stats["bytes_in"] += size_in
+        stats["bytes_out"] += size_out
+        stats["seconds"] += seconds
+
+def compression_summary():
+    with _compression_stats_lock:
+        return {
+            enc: dict(
+                s,
+                ratio=round(s["bytes_in"] / s["bytes_out"], 2) if s["bytes_out"] else None,
+                avg_ms=round(1000 * s["seconds"] / s["responses"], 3) if s["responses"] else None,
+            )
+            for enc, s in compression_stats.items()
+        }
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that compresses buffered JSON/text responses using the best
+    encoding the client accepts (zstd > br > gzip by default).
+    Streaming (text/event-stream) and already-encoded responses pass through untouched,
+    as do bodies smaller than `minimum_size`. zstd/brotli are used only if installed.
+    """
+    def __init__(self, app, minimum_size=1024, level=None, encodings=("zstd", "br", "gzip")):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compressors = {}
+        for enc in encodings:
+            try:
+                self.compressors[enc] = _COMPRESSOR_FACTORIES[enc](level)
+            except (ImportError, KeyError):
+                continue
+
+    def _negotiate(self, accept_encoding):
+        accepted = set()
+        for part in accept_encoding.split(","):
+            token, *params = part.strip().split(";")
+            q = 1.0
+            for param in params:
+                key, _, value = param.strip().partition("=")
+                if key == "q":
+                    try:
+                        q = float(value)
+                    except ValueError:
+                        q = 0.0
+            if q > 0:
+                accepted.add(token.strip().lower())
+        for enc in self.compressors:
+            if enc in accepted or "*" in accepted:
+                return enc
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.compressors:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers", []))
+        encoding = self._negotiate(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+        chunks = []
+
+        async def send_wrapper(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                resp_headers = {k.lower(): v for k, v in message.get("headers", [])}
+                content_type = resp_headers.get(b"content-type", b"").decode("latin-1")
+                passthrough = (
+                    b"content-encoding" in resp_headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            resp_headers = [(k, v) for k, v in start.get("headers", []) if k.lower() != b"content-length"]
+            if len(body) >= self.minimum_size:
+                t0 = time.perf_counter()
+                compressed = self.compressors[encoding](body)
+                _record_compression(encoding, len(body), len(compressed), time.perf_counter() - t0)
+                if len(compressed) < len(body):
+                    body = compressed
+                    resp_headers.append((b"content-encoding", encoding.encode()))
+                resp_headers.append((b"vary", b"Accept-Encoding"))
+            resp_headers.append((b"content-length", str(len(body)).encode()))
+            await send(dict(start, headers=resp_headers))
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+@mcp.custom_route("/stats", methods=["GET"])
+async def server_stats(request: Request) -> Response:
+    """GET /stats – compression ratio/time per encoding, background jobs and resource subscribers."""
+    return JSONResponse({
+        "compression": compression_summary(),
+        "jobs": background_jobs,
+        "subscriptions": subscription_summary(),
+    })
+
 # =====================================================================
 # START SERVER
 # =====================================================================
 
+def start_background_jobs():
+    """Starts the configured market-hours collectors."""
+    load_fno_snapshots()
+    if FNO_SNAPSHOT_DIR and archive_enabled():
+        start_background_job("fno_snapshots_fold", FNO_FOLD_INTERVAL, fold_fno_leftovers, market_hours_only=False)
+    if FNO_COLLECT_SYMBOLS:
+        start_background_job("fno_snapshots", FNO_COLLECT_INTERVAL, collect_fno_snapshots)
+    if INDEX_POLL_INTERVAL > 0:
+        start_background_job("indices_poller", INDEX_POLL_INTERVAL, poll_indices)
+    if WAREHOUSE_DATASETS and archive_enabled():
+        start_background_job("warehouse_fill", WAREHOUSE_FILL_INTERVAL, fill_warehouse, market_hours_only=False)
+
 def main() -> None:
     import uvicorn
 
+    # Compact descriptions / category allowlist for tools/list
+    configure_tool_listing()
+
+    # Market-hours collectors (F&O snapshots, indices poller, ...)
+    start_background_jobs()
+
     # Create the MCP Starlette app for streamable-http transport
     mcp_app = mcp.streamable_http_app()
 
+    # Compress large JSON responses (SSE streams pass through untouched)
+    if MCP_COMPRESSION_ENCODINGS:
+        mcp_app = CompressionMiddleware(
+            mcp_app,
+            minimum_size=MCP_COMPRESSION_MIN_BYTES,
+            level=MCP_COMPRESSION_LEVEL,
+            encodings=MCP_COMPRESSION_ENCODINGS,
+        )
+
     # Wrap with bearer auth + host rewrite middleware
     app = BearerAuthMiddleware(mcp_app)
 
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from nsekit_mcp import server
+
+
+def nsekit_chain(fetch_time, underlying, calls_ltp):
+    """Option chain shaped like NseKit's fno_live_option_chain (compact mode)."""
+    strikes = [24800.0, 24900.0, 25000.0, 25100.0, 25200.0]
+    return pd.DataFrame({
+        "Fetch_Time": fetch_time,
+        "Symbol": "NIFTY",
+        "Expiry_Date": "28-Oct-2025",
+        "CALLS_OI": [100, 200, 300, 400, 500],
+        "CALLS_LTP": calls_ltp,
+        "Strike_Price": strikes,
+        "PUTS_OI": [50, 60, 70, 80, 90],
+        "PUTS_LTP": [10.0, 20.0, 30.0, 40.0, 50.0],
+        "Underlying_Value": underlying,
+    })
+
+
+def test_option_chain_delta_returns_only_the_changed_strike():
+    stream = "test:option_chain_delta"
+    first = server.delta_response(
+        stream, nsekit_chain("2025-10-20 10:00:00", 25010.5, [250.0, 180.0, 120.0, 80.0, 45.0]),
+        server.OPTION_CHAIN_KEYS, 0,
+    )
+    assert first["full"]
+
+    delta = server.delta_response(
+        stream, nsekit_chain("2025-10-20 10:00:03", 25012.0, [250.0, 180.0, 125.0, 80.0, 45.0]),
+        server.OPTION_CHAIN_KEYS, first["version"],
+    )
+    assert not delta["full"]
+    assert [row["Strike_Price"] for row in delta["changed"]] == [25000.0]
+    assert delta["changed"][0]["CALLS_LTP"] == 125.0
+    assert "Fetch_Time" not in delta["changed"][0]
+    assert delta["snapshot"] == {"Fetch_Time": "2025-10-20 10:00:03", "Underlying_Value": 25012.0, "Symbol": "NIFTY"}
+    assert delta["unchanged"] == 4
+    assert delta["removed"] == []